@@ -0,0 +1,169 @@
+"""Production entry point: the Gradio UI and HTTP endpoints in one ASGI app.
+
+    python asgi.py                                  # ASSISTANT_WORKERS processes
+    uvicorn asgi:create_app --factory --port 8000   # a single process
+
+Routes:
+
+    /healthz   liveness; 200 while the process serves requests
+    /readyz    readiness; 503 until the UI is built, without a GROQ_API_KEY,
+               and once shutdown has begun
+    /metrics   per-stage latency percentiles and agent counters
+    /          the Gradio UI
+
+Gradio keeps its queue and per-session state in the worker process (as does
+assistant.sessions), so every request of a browser session must reach the
+same process. uvicorn's own workers share one socket and would scatter
+them; instead, with ASSISTANT_WORKERS > 1 each worker listens on its own
+port (ASSISTANT_PORT, +1, ...) and is meant to sit behind a load balancer
+with session affinity, e.g. nginx ``hash $remote_addr consistent``.
+
+Limits come from the environment: ASSISTANT_MAX_CONNECTIONS caps concurrent
+connections and requests per worker (503 beyond it), ASSISTANT_BACKLOG and
+ASSISTANT_KEEPALIVE tune the listener. On SIGTERM or Ctrl+C in-flight
+requests get ASSISTANT_GRACEFUL_TIMEOUT seconds to finish.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+HOST = os.environ.get("ASSISTANT_HOST", "0.0.0.0")
+PORT = int(os.environ.get("ASSISTANT_PORT", "8000"))
+WORKERS = int(os.environ.get("ASSISTANT_WORKERS", "1"))
+MAX_CONNECTIONS = int(os.environ.get("ASSISTANT_MAX_CONNECTIONS", "200"))
+BACKLOG = int(os.environ.get("ASSISTANT_BACKLOG", "2048"))
+KEEPALIVE = int(os.environ.get("ASSISTANT_KEEPALIVE", "5"))
+GRACEFUL_TIMEOUT = int(os.environ.get("ASSISTANT_GRACEFUL_TIMEOUT", "30"))
+
+_state = {"ready": False, "draining": False, "started_at": time.time()}
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(app):
+    from assistant import prefetch, transport
+
+    _state["ready"] = True
+    try:
+        yield
+    finally:
+        _state["ready"] = False
+        _state["draining"] = True
+        print(f"[voice_chat] Worker {os.getpid()} shutting down")
+        await asyncio.to_thread(prefetch.stop)
+        transport.close()
+
+
+def _readiness():
+    reasons = []
+    if _state["draining"]:
+        reasons.append("shutting down")
+    elif not _state["ready"]:
+        reasons.append("starting")
+    if not os.environ.get("GROQ_API_KEY"):
+        reasons.append("GROQ_API_KEY is not set")
+    return reasons
+
+
+def create_app():
+    """Build the FastAPI app with the Gradio UI mounted at /"""
+    import gradio as gr
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+
+    from assistant import metrics, ui
+
+    app = FastAPI(lifespan=_lifespan, docs_url=None, redoc_url=None, openapi_url=None)
+
+    @app.get("/healthz")
+    def healthz():
+        return {"status": "ok", "pid": os.getpid(), "uptime_s": round(time.time() - _state["started_at"], 1)}
+
+    @app.get("/readyz")
+    def readyz():
+        reasons = _readiness()
+        if reasons:
+            return JSONResponse({"status": "unavailable", "reasons": reasons}, status_code=503)
+        return {"status": "ready", "pid": os.getpid()}
+
+    @app.get("/metrics")
+    def metrics_endpoint():
+        return metrics.snapshot()
+
+    # Routes above are matched first; everything else goes to the UI
+    return gr.mount_gradio_app(app, ui.create_demo(), path="/")
+
+
+def serve(port=PORT, host=HOST):
+    """Run one worker process in the foreground"""
+    import uvicorn
+
+    uvicorn.run(
+        "asgi:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        limit_concurrency=MAX_CONNECTIONS,
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEPALIVE,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        log_level=os.environ.get("ASSISTANT_LOG_LEVEL", "info"),
+    )
+
+
+def _supervise(workers, port=PORT, host=HOST):
+    """Keep one worker process per port running until SIGTERM/SIGINT"""
+    context = multiprocessing.get_context("spawn")
+    processes = {}
+    stopping = []
+
+    def start(offset):
+        process = context.Process(target=serve, args=(port + offset, host), name=f"assistant-worker-{offset}")
+        process.start()
+        processes[offset] = process
+        print(f"[voice_chat] Worker {process.pid} listening on {host}:{port + offset}")
+
+    def stop(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for offset in range(workers):
+        start(offset)
+
+    while not stopping:
+        time.sleep(1)
+        for offset, process in list(processes.items()):
+            if not process.is_alive() and not stopping:
+                print(f"[voice_chat] Worker {process.pid} exited with {process.exitcode}; restarting")
+                start(offset)
+
+    # Each worker drains its own in-flight requests on SIGTERM. Ctrl+C already
+    # reached them through the process group, and a second signal would make
+    # uvicorn exit without draining.
+    if stopping[0] != signal.SIGINT:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+    deadline = time.time() + GRACEFUL_TIMEOUT + 5
+    for process in processes.values():
+        process.join(max(deadline - time.time(), 0))
+        if process.is_alive():
+            process.kill()
+    return 0
+
+
+def main():
+    if WORKERS <= 1:
+        serve()
+        return 0
+    return _supervise(WORKERS)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
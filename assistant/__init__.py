@@ -1,15 +1,37 @@
 import os
+import threading
 from dotenv import load_dotenv
-from groq import Groq
 
-# Load environment variables from .env file
+# Load environment variables from .env file before any module reads its settings
 load_dotenv()
 
-# Initialize Groq client
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-
 # Initialize NewsAPI client key placeholder
 NEWS_API_KEY = os.environ.get("NEWS_API_KEY", "your_news_api_key_here")
 
-# Shared conversation history (mutable list)
-conversation_history = []
+# The Groq SDK (and httpx under it) is the most expensive import in the
+# package, so ``client`` and ``async_client`` are built on first access
+_client_lock = threading.Lock()
+
+
+def _build_client():
+    from groq import Groq
+    return Groq(api_key=os.environ.get("GROQ_API_KEY"))
+
+
+def _build_async_client():
+    # Async client for the asyncio pipeline in assistant.async_core
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"))
+
+
+_LAZY = {"client": _build_client, "async_client": _build_async_client}
+
+
+def __getattr__(name):
+    builder = _LAZY.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _client_lock:
+        if name not in globals():
+            globals()[name] = builder()
+    return globals()[name]
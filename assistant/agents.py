@@ -1,219 +1,261 @@
-import requests
 import json
 from datetime import datetime
 import pytz
-import wikipedia
+from assistant import calc, currency, prefetch, registry, timezones, transport, wiki
+
+# Cache lifetimes (seconds) per agent, matched to how quickly the data changes
+WEATHER_TTL = 10 * 60
+NEWS_TTL = 5 * 60
+DEFINITION_TTL = 7 * 24 * 60 * 60
 
 
 # Agent Function 1: Weather Lookup
+def _weather_url(city):
+    return f"https://wttr.in/{city}?format=j1"
+
+
+def _parse_weather(city, response):
+    if response.status_code == 200:
+        data = response.json()
+        current = data['current_condition'][0]
+        weather_info = {
+            "city": city,
+            "temperature": f"{current['temp_C']}°C ({current['temp_F']}°F)",
+            "condition": current['weatherDesc'][0]['value'],
+            "humidity": f"{current['humidity']}%",
+            "wind": f"{current['windspeedKmph']} km/h",
+            "feels_like": f"{current['FeelsLikeC']}°C"
+        }
+        return json.dumps(weather_info)
+    return json.dumps({"error": "Could not fetch weather"})
+
+
+@registry.tool(
+    "get_weather",
+    "Get current weather information for a city. Use this when users ask about weather, temperature, or climate conditions.",
+    params={
+        "city": {"type": "string", "description": "The city name, e.g., London, New York, Tokyo"},
+    },
+    cache=("weather", WEATHER_TTL),
+    keywords=("weather", "temperature", "forecast", "rain", "snow", "sunny", "cloud", "storm", "hot", "warm",
+              "cold", "chilly", "freezing", "humid", "wind", "umbrella", "degrees"),
+)
 def get_weather(city):
     """Get weather for a city using wttr.in (free, no API key needed)"""
     try:
-        url = f"https://wttr.in/{city}?format=j1"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            current = data['current_condition'][0]
-            weather_info = {
-                "city": city,
-                "temperature": f"{current['temp_C']}°C ({current['temp_F']}°F)",
-                "condition": current['weatherDesc'][0]['value'],
-                "humidity": f"{current['humidity']}%",
-                "wind": f"{current['windspeedKmph']} km/h",
-                "feels_like": f"{current['FeelsLikeC']}°C"
-            }
-            return json.dumps(weather_info)
-        return json.dumps({"error": "Could not fetch weather"})
+        return _parse_weather(city, transport.get(_weather_url(city)))
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 
 # Agent Function 2: Calculator
+@registry.tool(
+    "calculate",
+    "Perform mathematical calculations. Use this for math problems, percentages, conversions, etc.",
+    params={
+        "expression": {
+            "type": "string",
+            "description": "The mathematical expression to evaluate, e.g., '15 * 20', '100 / 4', '(50 + 30) * 2'",
+        },
+    },
+    timeout=2,
+    keywords=("calculat", "compute", "plus", "minus", "times", "divided", "multipl", "percent", "%",
+              "square", "root", "power", "sum", "+", "*", "/", "="),
+)
 def calculate(expression):
-    """Safely evaluate mathematical expressions"""
+    """Safely evaluate mathematical expressions with the bounded AST engine"""
     try:
-        # Remove any potentially dangerous characters
-        allowed_chars = "0123456789+-*/(). "
-        cleaned = ''.join(c for c in expression if c in allowed_chars)
-        
-        # Evaluate safely
-        result = eval(cleaned, {"__builtins__": {}}, {})
         return json.dumps({
             "expression": expression,
-            "result": result
+            "result": calc.evaluate(expression)
         })
     except Exception as e:
         return json.dumps({"error": f"Cannot calculate: {str(e)}"})
 
 
 # Agent Function 3: World Time
+def _time_info(place):
+    current_time = datetime.now(pytz.timezone(place.timezone))
+    return {
+        "city": place.name,
+        "time": current_time.strftime("%I:%M %p"),
+        "date": current_time.strftime("%B %d, %Y"),
+        "day": current_time.strftime("%A"),
+        "timezone": place.timezone
+    }
+
+
+@registry.tool(
+    "get_world_time",
+    "Get the current time and date in any city or country. Use this when users ask 'what time is it in...', 'current time in...', etc. Several places can be asked for in one call.",
+    params={
+        "city": {
+            "type": "string",
+            "description": "The city name, e.g., London, New York, Tokyo, Paris. For several places separate them with commas, e.g., 'Tokyo, Paris and New York'",
+        },
+    },
+    timeout=2,
+    keywords=("time", "clock", "date", "day is it", "timezone", "time zone"),
+)
 def get_world_time(city):
-    """Get current time in a city"""
+    """Get current time in a city, or in several ("Tokyo, Paris and New York")"""
     try:
-        timezone_map = {
-            "london": "Europe/London",
-            "paris": "Europe/Paris",
-            "new york": "America/New_York",
-            "tokyo": "Asia/Tokyo",
-            "sydney": "Australia/Sydney",
-            "dubai": "Asia/Dubai",
-            "singapore": "Asia/Singapore",
-            "los angeles": "America/Los_Angeles",
-            "chicago": "America/Chicago",
-            "toronto": "America/Toronto",
-            "mumbai": "Asia/Kolkata",
-            "delhi": "Asia/Kolkata",
-            "bangalore": "Asia/Kolkata",
-            "kolkata": "Asia/Kolkata",
-            "beijing": "Asia/Shanghai",
-            "moscow": "Europe/Moscow",
-            "berlin": "Europe/Berlin",
-            "madrid": "Europe/Madrid",
-            "rome": "Europe/Rome",
-            "amsterdam": "Europe/Amsterdam",
-            "hong kong": "Asia/Hong_Kong",
-            "bangkok": "Asia/Bangkok",
-            "istanbul": "Europe/Istanbul",
-            "cairo": "Africa/Cairo",
-            "mexico city": "America/Mexico_City",
-            "sao paulo": "America/Sao_Paulo",
-            "buenos aires": "America/Argentina/Buenos_Aires",
-            "johannesburg": "Africa/Johannesburg"
-        }
-        
-        city_lower = city.lower()
-        timezone = timezone_map.get(city_lower)
-        
-        if not timezone:
+        found = timezones.lookup_many(city)
+        if not any(place for _, place in found):
             return json.dumps({"error": f"Timezone not found for {city}"})
-        
-        tz = pytz.timezone(timezone)
-        current_time = datetime.now(tz)
-        
-        time_info = {
-            "city": city,
-            "time": current_time.strftime("%I:%M %p"),
-            "date": current_time.strftime("%B %d, %Y"),
-            "day": current_time.strftime("%A"),
-            "timezone": timezone
-        }
-        return json.dumps(time_info)
+        if len(found) == 1:
+            return json.dumps(_time_info(found[0][1]))
+        return json.dumps({"times": [
+            _time_info(place) if place else {"city": name, "error": "Timezone not found"}
+            for name, place in found
+        ]})
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 
 # Agent Function 4: Wikipedia Search
+@registry.tool(
+    "search_wikipedia",
+    "Search Wikipedia for information about any topic - people, places, concepts, events, etc. Use this when users ask 'who is', 'what is', 'tell me about', or want to learn about something.",
+    params={
+        "query": {
+            "type": "string",
+            "description": "The topic to search for on Wikipedia, e.g., 'Albert Einstein', 'Quantum Computing', 'Eiffel Tower'",
+        },
+    },
+    keywords=("who ", "what is", "what are", "what was", "tell me about", "wikipedia", "history", "explain",
+              "where is", "when did", "when was", "how does", "learn about"),
+)
 def search_wikipedia(query):
     """Search Wikipedia and return summary"""
     try:
-        wikipedia.set_lang("en")
-        search_results = wikipedia.search(query, results=3)
-        
-        if not search_results:
-            return json.dumps({"error": f"No Wikipedia results found for '{query}'"})
-        
-        try:
-            summary = wikipedia.summary(search_results[0], sentences=4, auto_suggest=False)
-            page = wikipedia.page(search_results[0], auto_suggest=False)
-            
-            wiki_info = {
-                "title": page.title,
-                "summary": summary,
-                "url": page.url
-            }
-            return json.dumps(wiki_info)
-        except wikipedia.exceptions.DisambiguationError as e:
-            summary = wikipedia.summary(e.options[0], sentences=4, auto_suggest=False)
-            page = wikipedia.page(e.options[0], auto_suggest=False)
-            
-            wiki_info = {
-                "title": page.title,
-                "summary": summary,
-                "url": page.url
-            }
-            return json.dumps(wiki_info)
-            
+        return json.dumps(wiki.lookup(query))
+    except wiki.NotFound:
+        return json.dumps({"error": f"No Wikipedia results found for '{query}'"})
     except Exception as e:
         return json.dumps({"error": f"Wikipedia search failed: {str(e)}"})
 
 
 # Agent Function 5: News Headlines
+NEWS_URL = "https://feeds.bbci.co.uk/news/rss.xml"
+
+
+def _parse_news(response):
+    if response.status_code == 200:
+        import xml.etree.ElementTree as ET
+        root = ET.fromstring(response.content)
+        headlines = []
+        for item in root.findall('.//item')[:5]:
+            title = item.find('title').text
+            headlines.append(title)
+
+        return json.dumps({
+            "headlines": headlines,
+            "source": "BBC News",
+            "count": len(headlines)
+        })
+    return json.dumps({"error": "Could not fetch news"})
+
+
+@registry.tool(
+    "get_news",
+    "Get latest news headlines. Use this when users ask about news, current events, or what's happening in the world.",
+    params={
+        "category": {
+            "type": "string",
+            "description": "News category (general, business, technology, sports, etc.)",
+            "default": "general",
+        },
+    },
+    keywords=("news", "headline", "happening", "current events", "latest"),
+)
 def get_news(category="general"):
-    """Get latest news headlines"""
+    """Get latest news headlines from the prefetched feed"""
     try:
-        url = "https://feeds.bbci.co.uk/news/rss.xml"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(response.content)
-            headlines = []
-            for item in root.findall('.//item')[:5]:
-                title = item.find('title').text
-                headlines.append(title)
-            
-            return json.dumps({
-                "headlines": headlines,
-                "source": "BBC News",
-                "count": len(headlines)
-            })
+        return _parse_news(prefetch.get(NEWS_URL, NEWS_TTL))
     except Exception as e:
         return json.dumps({"error": f"Could not fetch news: {str(e)}"})
 
 
 # Agent Function 6: Currency Converter
+def _conversion_result(amount, from_currency, to_currency, rates):
+    targets = currency.split_codes(to_currency) or [to_currency]
+    results = currency.convert_many([(amount, from_currency, code) for code in targets], rates)
+    if len(results) == 1:
+        result = results[0]
+        return json.dumps({"error": result["error"]} if "error" in result else result)
+    if all("error" in r for r in results):
+        return json.dumps({"error": "; ".join(r["error"] for r in results)})
+    return json.dumps({"conversions": results})
+
+
+@registry.tool(
+    "convert_currency",
+    "Convert amount from one currency to another. Use this when users ask to convert money or currency exchange rates. Several target currencies can be converted in one call.",
+    params={
+        "amount": {"type": "number", "description": "The amount to convert"},
+        "from_currency": {"type": "string", "description": "Source currency code, e.g., USD, EUR, GBP, INR"},
+        "to_currency": {
+            "type": "string",
+            "description": "Target currency code, e.g., USD, EUR, GBP, INR. For several targets separate them with commas, e.g., 'EUR, GBP, JPY'",
+        },
+    },
+    keywords=("convert", "currency", "exchange", "rate", "dollar", "euro", "pound", "rupee", "yen", "yuan",
+              "franc", "peso", "usd", "eur", "gbp", "inr", "jpy", "money", "worth"),
+)
 def convert_currency(amount, from_currency, to_currency):
-    """Convert currency using free exchange rate API"""
+    """Convert currency with cross rates from the prefetched base-rate table"""
     try:
-        url = f"https://api.exchangerate-api.com/v4/latest/{from_currency.upper()}"
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            rates = data['rates']
-            
-            if to_currency.upper() not in rates:
-                return json.dumps({"error": f"Currency {to_currency} not found"})
-            
-            converted_amount = float(amount) * rates[to_currency.upper()]
-            
-            return json.dumps({
-                "original_amount": amount,
-                "from_currency": from_currency.upper(),
-                "to_currency": to_currency.upper(),
-                "converted_amount": round(converted_amount, 2),
-                "exchange_rate": rates[to_currency.upper()]
-            })
-        return json.dumps({"error": "Could not fetch exchange rates"})
+        return _conversion_result(amount, from_currency, to_currency, currency.table())
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 
+# News and rate tables change slowly; keep them warm instead of fetching per call
+prefetch.register(NEWS_URL, NEWS_TTL)
+prefetch.register(currency.rates_url(), currency.REFRESH_INTERVAL)
+
+
 # Agent Function 7: Dictionary
+def _definition_url(word):
+    return f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
+
+
+def _parse_definition(word, response):
+    if response.status_code == 200:
+        data = response.json()[0]
+
+        meanings = []
+        for meaning in data.get('meanings', [])[:2]:  # Get first 2 meanings
+            part_of_speech = meaning.get('partOfSpeech', '')
+            definitions = meaning.get('definitions', [])
+            if definitions:
+                meanings.append({
+                    "part_of_speech": part_of_speech,
+                    "definition": definitions[0].get('definition', ''),
+                    "example": definitions[0].get('example', '')
+                })
+
+        return json.dumps({
+            "word": word,
+            "meanings": meanings,
+            "phonetic": data.get('phonetic', '')
+        })
+    return json.dumps({"error": f"Definition not found for '{word}'"})
+
+
+@registry.tool(
+    "get_definition",
+    "Get the definition and meaning of a word. Use this when users ask 'what does X mean', 'define X', or want to know word meanings.",
+    params={
+        "word": {"type": "string", "description": "The word to define"},
+    },
+    cache=("definition", DEFINITION_TTL),
+    keywords=("mean", "defin", "synonym", "spell", "word"),
+)
 def get_definition(word):
     """Get word definition using Free Dictionary API"""
     try:
-        url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()[0]
-            
-            meanings = []
-            for meaning in data.get('meanings', [])[:2]:  # Get first 2 meanings
-                part_of_speech = meaning.get('partOfSpeech', '')
-                definitions = meaning.get('definitions', [])
-                if definitions:
-                    meanings.append({
-                        "part_of_speech": part_of_speech,
-                        "definition": definitions[0].get('definition', ''),
-                        "example": definitions[0].get('example', '')
-                    })
-            
-            return json.dumps({
-                "word": word,
-                "meanings": meanings,
-                "phonetic": data.get('phonetic', '')
-            })
-        return json.dumps({"error": f"Definition not found for '{word}'"})
+        return _parse_definition(word, transport.get(_definition_url(word)))
     except Exception as e:
         return json.dumps({"error": str(e)})
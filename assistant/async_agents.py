@@ -0,0 +1,61 @@
+"""Asyncio versions of the agent functions.
+
+Network-bound agents reuse the URL builders and response parsers from
+assistant.agents but fetch through the shared async HTTP client (news and
+rates read assistant.prefetch snapshots), so an awaiting tool call does not
+hold a thread. Each is registered as the async
+implementation of its tool and shares the tool's result cache with the
+synchronous agent. Tools without one (calculator, world time) run the
+synchronous agent on a worker thread.
+"""
+
+import json
+
+from assistant import agents, currency, prefetch, registry, transport, wiki
+
+
+@registry.async_impl("get_weather")
+async def get_weather(city):
+    """Get weather for a city using wttr.in (free, no API key needed)"""
+    try:
+        return agents._parse_weather(city, await transport.aget(agents._weather_url(city)))
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+@registry.async_impl("search_wikipedia")
+async def search_wikipedia(query):
+    """Search Wikipedia and return summary"""
+    try:
+        return json.dumps(await wiki.alookup(query))
+    except wiki.NotFound:
+        return json.dumps({"error": f"No Wikipedia results found for '{query}'"})
+    except Exception as e:
+        return json.dumps({"error": f"Wikipedia search failed: {str(e)}"})
+
+
+@registry.async_impl("get_news")
+async def get_news(category="general"):
+    """Get latest news headlines from the prefetched feed"""
+    try:
+        return agents._parse_news(await prefetch.aget(agents.NEWS_URL, agents.NEWS_TTL))
+    except Exception as e:
+        return json.dumps({"error": f"Could not fetch news: {str(e)}"})
+
+
+@registry.async_impl("convert_currency")
+async def convert_currency(amount, from_currency, to_currency):
+    """Convert currency with cross rates from the prefetched base-rate table"""
+    try:
+        return agents._conversion_result(amount, from_currency, to_currency, await currency.atable())
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+@registry.async_impl("get_definition")
+async def get_definition(word):
+    """Get word definition using Free Dictionary API"""
+    try:
+        return agents._parse_definition(word, await transport.aget(agents._definition_url(word)))
+    except Exception as e:
+        return json.dumps({"error": str(e)})
@@ -0,0 +1,200 @@
+"""Asyncio variant of the voice chat pipeline.
+
+Transcription and completions (streamed ones included) go through
+``assistant.async_client``, tools through ``assistant.registry.acall``
+(which prefers the ``assistant.async_agents`` implementations) and gTTS is
+offloaded to a worker thread, so an in-flight conversation only occupies
+the event loop while it is actually doing work. Gradio can register these
+async generators directly.
+"""
+
+import asyncio
+import inspect
+import operator
+
+import assistant
+from assistant import async_agents  # noqa: F401 - registers the async tool implementations
+from assistant import intake
+from assistant import listen
+from assistant import registry
+from assistant import resilience
+from assistant import sessions
+from assistant import tracing
+from assistant import tts as tts_module
+from assistant.core import (
+    GROQ_TIMEOUT,
+    MODEL,
+    _budgeted_client,
+    _busy,
+    _Op,
+    _request_size,
+    _routed_tool_calls,
+    _stage,
+    _stream_steps,
+    _turn_steps,
+    _usage_attributes,
+    _wikipedia_fallback,
+)
+
+
+async def _transcribe(audio):
+    if isinstance(audio, listen.Utterance):
+        with tracing.span("transcription", model="whisper-large-v3", segments=audio.segments) as span:
+            text = await asyncio.to_thread(audio.wait, resilience.remaining())
+            span.set(chars=len(text))
+            return text
+    with tracing.span("transcription", model="whisper-large-v3") as span:
+        with tracing.span("audio_intake"):
+            # Decoding and resampling are CPU work; keep them off the event loop
+            clip = await asyncio.to_thread(intake.prepare, audio)
+        text, cached = await intake.atranscribe(clip, _upload_audio)
+        span.set(cached=cached, chars=len(text), **clip.attributes())
+        return text
+
+
+async def _upload_audio(name, data):
+    transcription = await _groq_call(
+        "groq.audio",
+        "audio.transcriptions",
+        file=(name, data),
+        model="whisper-large-v3",
+    )
+    return transcription.text.strip()
+
+
+async def _budgeted_create(resource, kwargs):
+    create = operator.attrgetter(resource)(_budgeted_client(assistant.async_client)).create
+    return await create(timeout=resilience.timeout(GROQ_TIMEOUT), **kwargs)
+
+
+async def _groq_call(endpoint, resource, **kwargs):
+    """Async counterpart of assistant.core._groq_call"""
+    return await resilience.acall(endpoint, _budgeted_create, resource, kwargs)
+
+
+async def _completion(stage, **kwargs):
+    """Async counterpart of assistant.core._completion"""
+    with tracing.span(stage, model=MODEL, request_bytes=_request_size(kwargs),
+                      tools=len(kwargs.get("tools") or [])) as span:
+        response = await _groq_call(
+            "groq.chat",
+            "chat.completions",
+            model=MODEL,
+            temperature=0.7,
+            max_tokens=300,
+            **kwargs
+        )
+        message = response.choices[0].message
+        span.set(response_chars=len(message.content or ""), **_usage_attributes(getattr(response, "usage", None)))
+        return response
+
+
+async def _open_stream(kwargs):
+    return await _groq_call(
+        "groq.chat",
+        "chat.completions",
+        model=MODEL,
+        temperature=0.7,
+        max_tokens=300,
+        stream=True,
+        **kwargs
+    )
+
+
+async def _run_tool_calls(tool_calls):
+    return await asyncio.gather(*(registry.acall(tc["name"], tc["arguments"]) for tc in tool_calls))
+
+
+# Awaitable counterparts of assistant.core._OPS; plain values are used as they are
+_OPS = {
+    "transcribe": _transcribe,
+    "route": _routed_tool_calls,
+    "complete": lambda stage, kwargs: _completion(stage, **kwargs),
+    "stream": _open_stream,
+    "next_chunk": lambda stream: anext(stream, None),
+    "tools": _run_tool_calls,
+    "wikipedia": lambda user_message: asyncio.to_thread(_wikipedia_fallback, user_message),
+    "speak": lambda text, backend: asyncio.to_thread(tts_module.text_to_speech, text, backend=backend),
+    "wait": asyncio.wrap_future,
+}
+
+
+async def _drive(steps, turn, deadline):
+    """Async counterpart of assistant.core._drive"""
+    send, value = steps.send, None
+    try:
+        while True:
+            try:
+                step = send(value)
+            except StopIteration:
+                return
+            if not isinstance(step, _Op):
+                yield step
+                send, value = steps.send, None
+                continue
+            try:
+                with _stage(turn, deadline):
+                    value = _OPS[step.name](*step.args)
+                    if inspect.isawaitable(value):
+                        value = await value
+                send = steps.send
+            except Exception as e:
+                send, value = steps.throw, e
+    finally:
+        steps.close()
+
+
+async def voice_chat_async(audio, session_id, enable_tts, tts_backend=None, llm_rewrite=False):
+    """Async counterpart of assistant.core.voice_chat_updates.
+
+    Yields a (chat, state, audio, status) tuple as each stage starts; the
+    last tuple is the result of the turn.
+    """
+    # Gradio may resume the generator from another task, so the turn span is
+    # passed explicitly rather than relied on as the current span
+    turn = tracing.start("turn", pipeline="async", tts=bool(enable_tts))
+    try:
+        async for update in _drive(_turn_steps(audio, session_id, enable_tts, tts_backend, llm_rewrite),
+                                   turn, resilience.expires_at()):
+            yield update
+    finally:
+        tracing.finish(turn)
+
+
+async def voice_chat_stream_async(audio, session_id, enable_tts, tts_backend=None, llm_rewrite=False):
+    """Async counterpart of assistant.core.voice_chat_stream.
+
+    Reads the completion from an AsyncGroq stream, so a streaming turn holds
+    no thread while it waits for tokens; only sentence TTS runs on the
+    speech pool.
+    """
+    turn = tracing.start("turn", pipeline="async_stream", tts=bool(enable_tts))
+    deadline = resilience.expires_at()
+    try:
+        steps = _stream_steps(audio, session_id, enable_tts, tts_backend, llm_rewrite, turn, deadline)
+        async for update in _drive(steps, turn, deadline):
+            yield update
+    finally:
+        tracing.finish(turn)
+
+
+async def respond_async(audio, session_id, enable_tts, stream_response, tts_backend=None, llm_rewrite=False):
+    """Async Gradio entry point mirroring assistant.core.respond"""
+    session = sessions.store.get(session_id)
+    if not session.begin_turn():
+        yield _busy(session.id)
+        return
+    try:
+        pipeline = voice_chat_stream_async if stream_response else voice_chat_async
+        async for update in pipeline(audio, session.id, enable_tts, tts_backend, llm_rewrite):
+            yield update
+    finally:
+        session.end_turn()
+
+
+async def respond_live_async(session_id, enable_tts, stream_response, tts_backend=None, llm_rewrite=False):
+    """Async counterpart of assistant.core.respond_live"""
+    session = sessions.store.get(session_id)
+    async for update in respond_async(listen.finish(session.id), session.id, enable_tts, stream_response,
+                                      tts_backend, llm_rewrite):
+        yield update
@@ -0,0 +1,248 @@
+"""TTL + LRU result cache for the agent functions.
+
+Each agent gets its own named cache with a TTL suited to how fast its data
+changes. Entries live in a bounded in-memory LRU; when ASSISTANT_CACHE_DIR is
+set, they are also written to a small SQLite file so the cache survives
+restarts. Hit/miss/eviction counters are available through ``stats()``.
+Concurrent misses for the same key are coalesced into one upstream call by
+the ``assistant.singleflight`` group of the same name.
+"""
+
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from assistant import singleflight
+
+DEFAULT_MAXSIZE = int(os.environ.get("ASSISTANT_CACHE_SIZE", "1024"))
+
+# Registry of every cache created through ``get_cache``/``cached``
+_caches = {}
+_caches_lock = threading.Lock()
+_disk_backend = None
+
+
+def normalize(value):
+    """Fold case and whitespace so 'London ' and 'london' share an entry"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def make_key(*args, **kwargs):
+    parts = [normalize(a) for a in args]
+    parts.extend(f"{k}={normalize(v)}" for k, v in sorted(kwargs.items()))
+    return json.dumps(parts, ensure_ascii=False, default=str)
+
+
+class DiskBackend:
+    """SQLite-backed persistent store shared by all named caches"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL,"
+                " value TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+
+    def get(self, namespace, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, namespace, key, value, expires_at):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at),
+            )
+
+    def clear(self, namespace=None):
+        with self._lock, self._conn:
+            if namespace is None:
+                self._conn.execute("DELETE FROM cache")
+            else:
+                self._conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, name, ttl, maxsize=DEFAULT_MAXSIZE, backend=None):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.backend = backend
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return (True, value) on a fresh hit, (False, None) otherwise"""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+
+        if self.backend is not None:
+            stored = self.backend.get(self.name, key)
+            if stored is not None:
+                with self._lock:
+                    self._store(key, *stored)
+                    self.hits += 1
+                return True, stored[0]
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self.backend is not None:
+            self.backend.set(self.name, key, value, expires_at)
+
+    def _store(self, key, value, expires_at):
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        if self.backend is not None:
+            self.backend.clear(self.name)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def _default_backend():
+    global _disk_backend
+    cache_dir = os.environ.get("ASSISTANT_CACHE_DIR")
+    if not cache_dir:
+        return None
+    if _disk_backend is None:
+        _disk_backend = DiskBackend(os.path.join(cache_dir, "agents.sqlite3"))
+    return _disk_backend
+
+
+def get_cache(name, ttl, maxsize=DEFAULT_MAXSIZE):
+    """Return the named cache, creating it on first use"""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = TTLCache(name, ttl, maxsize=maxsize, backend=_default_backend())
+            _caches[name] = cache
+        return cache
+
+
+def is_error(result):
+    """True for an agent result that is an {"error": ...} object or not JSON at all"""
+    try:
+        parsed = json.loads(result)
+    except (TypeError, ValueError):
+        return True
+    return isinstance(parsed, dict) and "error" in parsed
+
+
+def cached(name, ttl, maxsize=DEFAULT_MAXSIZE):
+    """Cache a JSON-returning agent function; error results are never stored.
+
+    Works for plain and ``async def`` functions; both share the named cache,
+    and concurrent misses from either kind wait on a single upstream call.
+    """
+    def decorator(func):
+        cache = get_cache(name, ttl, maxsize)
+        flight = singleflight.group(name)
+
+        if inspect.iscoroutinefunction(func):
+            async def async_fetch(key, args, kwargs):
+                result = await func(*args, **kwargs)
+                if not is_error(result):
+                    cache.set(key, result)
+                return result
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = make_key(*args, **kwargs)
+                hit, value = cache.get(key)
+                if hit:
+                    return value
+                return await flight.ado(key, async_fetch, key, args, kwargs)
+
+            async_wrapper.cache = cache
+            async_wrapper.flight = flight
+            return async_wrapper
+
+        def fetch(key, args, kwargs):
+            result = func(*args, **kwargs)
+            if not is_error(result):
+                cache.set(key, result)
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(*args, **kwargs)
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            return flight.do(key, fetch, key, args, kwargs)
+
+        wrapper.cache = cache
+        wrapper.flight = flight
+        return wrapper
+    return decorator
+
+
+def stats():
+    """Counters for every named cache, keyed by cache name"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def clear():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,217 @@
+"""Bounded arithmetic engine for the calculator agent.
+
+Expressions are parsed into a Python AST and evaluated by walking a whitelist
+of node types, so nothing is ever handed to ``eval``. Operand magnitude,
+exponent size, result size and the number of evaluation steps are all
+capped, which keeps every calculation inside a predictable time bound (no
+``9**9**9``). Percentages ("15% of 80"), common math functions and constants
+are supported, parsed expressions are cached, and ``evaluate_many`` handles a
+batch in one call.
+"""
+
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+
+MAX_LENGTH = 256
+MAX_STEPS = 500
+MAX_MAGNITUDE = 1e100
+MAX_EXPONENT = 1000
+MAX_FACTORIAL = 170
+
+
+class CalculationError(ValueError):
+    pass
+
+
+def _factorial(n):
+    if n != int(n) or n < 0:
+        raise CalculationError("factorial needs a non-negative integer")
+    if n > MAX_FACTORIAL:
+        raise CalculationError(f"factorial argument above {MAX_FACTORIAL}")
+    return math.factorial(int(n))
+
+
+_FUNCTIONS = {
+    "sqrt": math.sqrt,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "log": math.log,
+    "ln": math.log,
+    "log10": math.log10,
+    "log2": math.log2,
+    "exp": math.exp,
+    "abs": abs,
+    "round": round,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "factorial": _factorial,
+    "radians": math.radians,
+    "degrees": math.degrees,
+}
+
+_CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+_REWRITES = [
+    (re.compile(r"(\d+(?:\.\d+)?)\s*(?:%|percent)\s+of\s+"), r"(\1/100)*"),
+    (re.compile(r"(\d+(?:\.\d+)?)\s*percent\b"), r"(\1/100)"),
+    # A "%" followed by an operand is modulo ("50 % 3"); otherwise it is a percentage
+    (re.compile(r"(\d+(?:\.\d+)?)\s*%(?!\s*[\d(.a-z])"), r"(\1/100)"),
+    (re.compile(r"\bsquare root of\s+(\d+(?:\.\d+)?)"), r"sqrt(\1)"),
+    (re.compile(r"(?<=[\d)\s])x(?=[\s\d(])"), "*"),
+    (re.compile(r"[×✕]"), "*"),
+    (re.compile(r"÷"), "/"),
+    (re.compile(r"\^"), "**"),
+    (re.compile(r"(\d),(\d{3})"), r"\1\2"),
+]
+
+
+def normalize(expression):
+    """Rewrite spoken/typed forms ("15% of 80", "2^8", "3 x 4") into Python syntax"""
+    expr = expression.strip().lower().rstrip("=?. ")
+    for pattern, replacement in _REWRITES:
+        expr = pattern.sub(replacement, expr)
+    return expr
+
+
+def _validate(node):
+    count = 0
+    called = {id(child.func) for child in ast.walk(node) if isinstance(child, ast.Call)}
+    for child in ast.walk(node):
+        count += 1
+        if isinstance(child, (ast.Expression, ast.Load)) or type(child) in _BINARY or type(child) in _UNARY:
+            continue
+        if isinstance(child, (ast.BinOp, ast.UnaryOp)):
+            continue
+        if isinstance(child, ast.Constant):
+            if isinstance(child.value, bool) or not isinstance(child.value, (int, float)):
+                raise CalculationError("only numbers are allowed")
+            continue
+        if isinstance(child, ast.Name):
+            if child.id not in _CONSTANTS and child.id not in _FUNCTIONS:
+                raise CalculationError(f"unknown name '{child.id}'")
+            if child.id in _FUNCTIONS and id(child) not in called:
+                raise CalculationError(f"'{child.id}' needs an argument, e.g. {child.id}(2)")
+            continue
+        if isinstance(child, ast.Call):
+            if not isinstance(child.func, ast.Name) or child.func.id not in _FUNCTIONS or child.keywords:
+                raise CalculationError("unsupported function call")
+            continue
+        raise CalculationError(f"unsupported syntax: {type(child).__name__}")
+    if count > MAX_STEPS:
+        raise CalculationError("expression too long")
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression):
+    """Parse and validate once; the returned tree is reused for repeat expressions"""
+    expr = normalize(expression)
+    if not expr:
+        raise CalculationError("empty expression")
+    if len(expr) > MAX_LENGTH:
+        raise CalculationError("expression too long")
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError:
+        raise CalculationError("invalid expression")
+    _validate(tree)
+    return tree
+
+
+def _check(value):
+    if isinstance(value, complex):
+        raise CalculationError("result is not a real number")
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        raise CalculationError("result is not a finite number")
+    if abs(value) > MAX_MAGNITUDE:
+        raise CalculationError("number too large")
+    return value
+
+
+def _power(base, exponent):
+    if abs(exponent) > MAX_EXPONENT:
+        raise CalculationError(f"exponent above {MAX_EXPONENT}")
+    # Estimate the result size before computing it
+    if base not in (0, 1, -1) and exponent * math.log10(abs(base)) > math.log10(MAX_MAGNITUDE):
+        raise CalculationError("number too large")
+    try:
+        return operator.pow(base, exponent)
+    except ZeroDivisionError:
+        raise CalculationError("zero cannot be raised to a negative power")
+    except OverflowError:
+        raise CalculationError("number too large")
+
+
+def _eval(node, budget):
+    budget[0] -= 1
+    if budget[0] < 0:
+        raise CalculationError("too many evaluation steps")
+    if isinstance(node, ast.Expression):
+        return _eval(node.body, budget)
+    if isinstance(node, ast.Constant):
+        return _check(node.value)
+    if isinstance(node, ast.Name):
+        return _CONSTANTS[node.id]
+    if isinstance(node, ast.UnaryOp):
+        return _check(_UNARY[type(node.op)](_eval(node.operand, budget)))
+    if isinstance(node, ast.BinOp):
+        left = _eval(node.left, budget)
+        right = _eval(node.right, budget)
+        if isinstance(node.op, ast.Pow):
+            return _check(_power(left, right))
+        try:
+            return _check(_BINARY[type(node.op)](left, right))
+        except ZeroDivisionError:
+            raise CalculationError("division by zero")
+    if isinstance(node, ast.Call):
+        args = [_eval(arg, budget) for arg in node.args]
+        try:
+            return _check(_FUNCTIONS[node.func.id](*args))
+        except (TypeError, ValueError, OverflowError) as e:
+            if isinstance(e, CalculationError):
+                raise
+            raise CalculationError(f"{node.func.id}: {str(e)}")
+    raise CalculationError("unsupported expression")
+
+
+def _tidy(value):
+    if isinstance(value, float):
+        value = round(value, 10)
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def evaluate(expression):
+    """Evaluate one expression, raising CalculationError on invalid or unbounded input"""
+    tree = compile_expression(expression)
+    return _tidy(_eval(tree, [MAX_STEPS]))
+
+
+def evaluate_many(expressions):
+    """Evaluate a batch; each item is {"expression", "result"} or {"expression", "error"}"""
+    results = []
+    for expression in expressions:
+        try:
+            results.append({"expression": expression, "result": evaluate(expression)})
+        except CalculationError as e:
+            results.append({"expression": expression, "error": str(e)})
+    return results
@@ -1,11 +1,41 @@
+import contextlib
+import contextvars
 import json
+import operator
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import assistant
 from assistant import agents
+from assistant import intake
+from assistant import listen
+from assistant import registry
+from assistant import render
+from assistant import resilience
+from assistant import router
+from assistant import sessions
+from assistant import tracing
 from assistant import tts as tts_module
-from assistant import tools as tools_module
+from assistant import wiki
 
-# Bring over tools in the same shape the original code expected
-tools = tools_module.tools
+MODEL = "llama-3.3-70b-versatile"
+
+SYSTEM_PROMPT = "You are a helpful voice assistant with access to weather, calculator, world time, Wikipedia, news, currency conversion, and dictionary. Use the appropriate tool when users ask relevant questions. Be concise and friendly."
+
+FINAL_SYSTEM_PROMPT = "You are a helpful voice assistant. Present information in a natural, conversational way. Keep responses concise."
+
+BUSY_STATUS = "⏳ Still answering your previous message"
+
+# Cap per Groq request; the turn's remaining budget may cut it shorter
+GROQ_TIMEOUT = float(os.environ.get("ASSISTANT_GROQ_TIMEOUT", "15"))
+
+# Start a Wikipedia lookup for "who is ..." turns the router leaves to the model
+WIKIPEDIA_PREFETCH = os.environ.get("ASSISTANT_WIKIPEDIA_PREFETCH", "1") == "1"
+
+_tool_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ASSISTANT_TOOL_WORKERS", "8")),
+    thread_name_prefix="tool",
+)
 
 
 def _build_chat_display(conv_history):
@@ -21,196 +51,645 @@ def _build_chat_display(conv_history):
     return chat_display
 
 
-def voice_chat(audio, history, enable_tts):
+def _fallback_message(function_response):
+    """Turn a raw tool result into a reply when the final model call fails"""
+    try:
+        parsed = json.loads(function_response)
+        if isinstance(parsed, dict) and "error" not in parsed:
+            # Wikipedia-like result
+            if "title" in parsed and "summary" in parsed:
+                return f"{parsed.get('title')}: {parsed.get('summary')} (More: {parsed.get('url', '')})"
+            # News headlines
+            elif "headlines" in parsed:
+                return "Top headlines: " + "; ".join(parsed.get('headlines', []))
+            # Currency / simple numeric responses
+            return str(parsed)
+        return parsed.get("error") if isinstance(parsed, dict) else str(parsed)
+    except Exception:
+        # As a last resort, return the raw function response string
+        return function_response
+
+
+def _transcribe(audio, stage="transcription"):
+    if isinstance(audio, listen.Utterance):
+        # Live input: earlier segments were transcribed while the user was talking
+        with tracing.span(stage, model="whisper-large-v3", segments=audio.segments) as span:
+            text = audio.wait(resilience.remaining())
+            span.set(chars=len(text))
+            return text
+    with tracing.span(stage, model="whisper-large-v3") as span:
+        with tracing.span("audio_intake"):
+            clip = intake.prepare(audio)
+        text, cached = intake.transcribe(clip, _upload_audio)
+        span.set(cached=cached, chars=len(text), **clip.attributes())
+        return text
+
+
+def _upload_audio(name, data):
+    transcription = _groq_call(
+        "groq.audio",
+        "audio.transcriptions",
+        file=(name, data),
+        model="whisper-large-v3",
+    )
+    return transcription.text.strip()
+
+
+def _budgeted_client(client):
+    # Under a turn budget an SDK retry would run past it; the breaker and fallbacks take over
+    return client if resilience.remaining() is None else client.with_options(max_retries=0)
+
+
+def _budgeted_create(resource, kwargs):
+    create = operator.attrgetter(resource)(_budgeted_client(assistant.client)).create
+    return create(timeout=resilience.timeout(GROQ_TIMEOUT), **kwargs)
+
+
+def _groq_call(endpoint, resource, **kwargs):
+    """``client.<resource>.create(**kwargs)`` through the endpoint's circuit breaker, within the turn budget"""
+    return resilience.call(endpoint, _budgeted_create, resource, kwargs)
+
+
+@contextlib.contextmanager
+def _stage(turn, deadline):
+    """Run a pipeline stage as part of ``turn`` and within its latency budget"""
+    with tracing.use(turn), resilience.within(deadline):
+        yield
+
+
+def _request_size(kwargs):
+    """Bytes of the prompt payload (messages and tool schemas) sent to the model"""
+    return len(json.dumps({k: kwargs.get(k) for k in ("messages", "tools")}, default=str))
+
+
+def _usage_attributes(usage):
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None),
+    }
+
+
+def _completion(stage, **kwargs):
+    """Chat completion recorded as a ``stage`` span with token counts and payload sizes"""
+    with tracing.span(stage, model=MODEL, request_bytes=_request_size(kwargs),
+                      tools=len(kwargs.get("tools") or [])) as span:
+        response = _groq_call(
+            "groq.chat",
+            "chat.completions",
+            model=MODEL,
+            temperature=0.7,
+            max_tokens=300,
+            **kwargs
+        )
+        message = response.choices[0].message
+        span.set(response_chars=len(message.content or ""), **_usage_attributes(getattr(response, "usage", None)))
+        return response
+
+
+def _add_user_message(session, user_message):
+    """Append the user turn unless it repeats the previous one; returns False on duplicates"""
+    try:
+        last_user = None
+        for msg in reversed(session.messages):
+            if msg.get("role") == "user" and msg.get("content"):
+                last_user = msg.get("content").strip()
+                break
+
+        if not user_message:
+            print("[voice_chat] Ignored empty transcription")
+            return False
+        if last_user is None or last_user != user_message:
+            print(f"[voice_chat] Adding to conversation history: {user_message}")
+            session.append({"role": "user", "content": user_message})
+            return True
+        # Duplicate detected — ignore this transcription to prevent double input
+        print(f"[voice_chat] Ignored duplicate user transcription: {user_message}")
+        return False
+    except Exception as e:
+        print(f"[voice_chat] Error when adding to conversation history: {str(e)}")
+        session.append({"role": "user", "content": user_message})
+        return True
+
+
+def _valid_history(session):
+    """User/assistant turns for the API, trimmed to the session token budget"""
+    return sessions.store.prompt_history(session)
+
+
+def _normalize_tool_calls(tool_calls):
+    """Convert SDK tool call objects (or streamed dicts) into plain dicts"""
+    normalized = []
+    for i, tc in enumerate(tool_calls or []):
+        if isinstance(tc, dict):
+            name, arguments, call_id = tc["name"], tc["arguments"], tc.get("id")
+        else:
+            name, arguments, call_id = tc.function.name, tc.function.arguments, tc.id
+        normalized.append({"id": call_id or f"call_{i}", "name": name, "arguments": arguments or "{}"})
+    return normalized
+
+
+def _run_tool_calls(tool_calls):
+    """Dispatch every tool call concurrently and return results in call order.
+
+    All calls start together, so the turn waits for the slowest tool rather
+    than the sum of them; each is abandoned after its registered timeout or
+    when the turn's latency budget runs out, whichever comes first.
+    """
+    started = time.monotonic()
+    futures = [
+        (tc, registry.time_limit(tc["name"]),
+         _tool_executor.submit(contextvars.copy_context().run, registry.call, tc["name"], tc["arguments"]))
+        for tc in tool_calls
+    ]
+    results = []
+    for tc, timeout, future in futures:
+        try:
+            result = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+        except FutureTimeout:
+            print(f"[voice_chat] Tool {tc['name']} timed out after {timeout:.1f}s")
+            registry.timed_out(tc["name"])
+            result = json.dumps({"error": f"{tc['name']} timed out"})
+        results.append(result)
+    return results
+
+
+def _prefetch_wikipedia(user_message):
+    """Start the likely Wikipedia lookup while the model decides whether to call the tool"""
+    if not WIKIPEDIA_PREFETCH:
+        return
+    candidate = router.classify(user_message)
+    if candidate is not None and candidate.tool == "search_wikipedia":
+        wiki.prefetch([candidate.arguments["query"]])
+
+
+def _routed_tool_calls(user_message):
+    """Tool calls picked by the local intent router, or None to ask the model"""
+    route = router.route(user_message)
+    if route is None:
+        _prefetch_wikipedia(user_message)
+        return None
+    print(f"[voice_chat] Routed locally to {route.tool} ({route.confidence:.2f})")
+    return [{"id": "route_0", "name": route.tool, "arguments": json.dumps(route.arguments)}]
+
+
+def _final_messages(valid_history, tool_calls, results):
+    """Follow-up prompt carrying every tool result as a tool-role message"""
+    messages = [
+        {"role": "system", "content": FINAL_SYSTEM_PROMPT},
+        *valid_history,
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {"id": tc["id"], "type": "function", "function": {"name": tc["name"], "arguments": tc["arguments"]}}
+                for tc in tool_calls
+            ],
+        },
+    ]
+    for tc, result in zip(tool_calls, results):
+        messages.append({"role": "tool", "tool_call_id": tc["id"], "name": tc["name"], "content": result})
+    return messages
+
+
+def _fallback_messages(results):
+    return " ".join(_fallback_message(result) for result in results)
+
+
+def _wikipedia_fallback(user_message):
+    """Answer knowledge questions from Wikipedia when the chat model is unavailable"""
+    if resilience.expired():
+        # Nothing is left of the turn's budget to look anything up with
+        return None
+    lowered = user_message.lower()
+    if not any(k in lowered for k in ("tell me about", "tell me something about", "who is", "what is", "what are")):
+        return None
+    wiki_result = agents.search_wikipedia(user_message)
+    try:
+        wiki_json = json.loads(wiki_result)
+        if "error" not in wiki_json:
+            return f"{wiki_json.get('title')}: {wiki_json.get('summary')} (More: {wiki_json.get('url', '')})"
+        return wiki_json.get("error")
+    except Exception:
+        return wiki_result
+
+
+class _Op:
+    """One I/O step of a turn, performed by whichever driver runs the turn's steps.
+
+    The turn logic is written once, as generators that yield display updates
+    and ``_Op``s (see ``_turn_steps``/``_stream_steps``); ``_drive`` performs
+    the ops with the blocking functions in ``_OPS`` and
+    ``assistant.async_core`` with their awaitable counterparts. A failed op
+    is raised inside the steps where it was yielded.
+    """
+
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, *args):
+        self.name = name
+        self.args = args
+
+
+def _drive(steps, turn, deadline):
+    """Yield the updates of ``steps``, performing each _Op as a stage of ``turn``"""
+    send, value = steps.send, None
+    try:
+        while True:
+            try:
+                step = send(value)
+            except StopIteration:
+                return
+            if not isinstance(step, _Op):
+                yield step
+                send, value = steps.send, None
+                continue
+            try:
+                with _stage(turn, deadline):
+                    value = _OPS[step.name](*step.args)
+                send = steps.send
+            except Exception as e:
+                send, value = steps.throw, e
+    finally:
+        steps.close()
+
+
+def _update(session, status, audio=None):
+    """A (chat, state, audio, status) tuple for Gradio"""
+    return _build_chat_display(session.messages), session.id, audio, status
+
+
+def _open_stream(kwargs):
+    return _groq_call(
+        "groq.chat",
+        "chat.completions",
+        model=MODEL,
+        temperature=0.7,
+        max_tokens=300,
+        stream=True,
+        **kwargs
+    )
+
+
+_OPS = {
+    "transcribe": _transcribe,
+    "route": _routed_tool_calls,
+    "complete": lambda stage, kwargs: _completion(stage, **kwargs),
+    "stream": _open_stream,
+    "next_chunk": lambda stream: next(stream, None),
+    "tools": _run_tool_calls,
+    "wikipedia": _wikipedia_fallback,
+    "speak": lambda text, backend: tts_module.text_to_speech(text, backend=backend),
+    "wait": lambda future: future.result(),
+}
+
+
+def voice_chat(audio, session_id, enable_tts, tts_backend=None, llm_rewrite=False):
     """Process voice input and return AI response with agent functionality"""
-    # use shared conversation history from package
-    conversation_history = assistant.conversation_history
+    update = None
+    for update in voice_chat_updates(audio, session_id, enable_tts, tts_backend, llm_rewrite):
+        pass
+    return update
+
+
+def voice_chat_updates(audio, session_id, enable_tts, tts_backend=None, llm_rewrite=False):
+    """Generator form of voice_chat.
+
+    Yields a (chat, state, audio, status) tuple as each stage starts, so the
+    UI shows the transcript, tool use and the text reply before the speech
+    is ready. The last tuple is the one voice_chat returns.
+    """
+    # Gradio may resume the generator on another thread, so the turn span is
+    # passed explicitly rather than relied on as the current span
+    turn = tracing.start("turn", pipeline="sync", tts=bool(enable_tts))
+    try:
+        yield from _drive(_turn_steps(audio, session_id, enable_tts, tts_backend, llm_rewrite),
+                          turn, resilience.expires_at())
+    finally:
+        tracing.finish(turn)
+
+
+def _turn_steps(audio, session_id, enable_tts, tts_backend, llm_rewrite):
+    """Steps of a staged turn, shared by voice_chat_updates and voice_chat_async"""
+    session = sessions.store.get(session_id)
 
     if audio is None:
         print("[voice_chat] No audio provided")
-        return history, conversation_history, None, "⚪ Ready"
+        yield _update(session, "⚪ Ready")
+        return
 
     try:
         print("[voice_chat] Transcribing audio...")
-        status = "🎤 Transcribing..."
+        yield _update(session, "🎤 Transcribing...")
 
         # Step 1: Transcribe audio
-        with open(audio, "rb") as file:
-            transcription = assistant.client.audio.transcriptions.create(
-                file=(audio, file.read()),
-                model="whisper-large-v3",
-            )
-
-        user_message = transcription.text.strip()
+        user_message = yield _Op("transcribe", audio)
 
         print(f"[voice_chat] Transcription: {user_message}")
 
         # Add to internal history with simple dedupe
-        try:
-            last_user = None
-            for msg in reversed(conversation_history):
-                if msg.get("role") == "user" and msg.get("content"):
-                    last_user = msg.get("content").strip()
-                    break
+        if not _add_user_message(session, user_message):
+            yield _update(session, "⚪ Ready")
+            return
 
-            if last_user is None or last_user != user_message:
-                print(f"[voice_chat] Adding to conversation history: {user_message}")
-                conversation_history.append({"role": "user", "content": user_message})
-            else:
-                # Duplicate detected — ignore this transcription to prevent double input
-                print(f"[voice_chat] Ignored duplicate user transcription: {user_message}")
-                chat_display = _build_chat_display(conversation_history)
-
-                status = "⚪ Ready"
-                return chat_display, conversation_history, None, status
-        except Exception as e:
-            print(f"[voice_chat] Error when adding to conversation history: {str(e)}")
-            conversation_history.append({"role": "user", "content": user_message})
-
-        # Filter history to only include valid messages for API (only user and assistant)
-        valid_history = []
-        for msg in conversation_history:
-            if msg.get("role") in ["user", "assistant"] and msg.get("content"):
-                valid_history.append({"role": msg["role"], "content": msg["content"]})
+        valid_history = _valid_history(session)
 
         print(f"[voice_chat] Valid history: {valid_history}")
 
-        status = "🤖 Processing..."
-
-        # Step 2: Get AI response with tool calling
-        try:
-            response = assistant.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are a helpful voice assistant with access to weather, calculator, world time, Wikipedia, news, currency conversion, and dictionary. Use the appropriate tool when users ask relevant questions. Be concise and friendly."},
-                    *valid_history
-                ],
-                tools=tools,
-                tool_choice="auto",
-                temperature=0.7,
-                max_tokens=300
-            )
-        except Exception as e:
-            print(f"[voice_chat] Chat completion failed: {str(e)}")
-
-            lowered = user_message.lower()
-            if any(k in lowered for k in ("tell me about", "tell me something about", "who is", "what is", "what are")):
-                wiki_result = agents.search_wikipedia(user_message)
-                try:
-                    wiki_json = json.loads(wiki_result)
-                    if "error" not in wiki_json:
-                        ai_message = f"{wiki_json.get('title')}: {wiki_json.get('summary')} (More: {wiki_json.get('url', '')})"
-                    else:
-                        ai_message = wiki_json.get("error")
-                except Exception:
-                    ai_message = wiki_result
-
-                conversation_history.append({"role": "assistant", "content": ai_message})
+        yield _update(session, "🤖 Processing...")
 
+        # Step 2: Pick tools locally when the intent is obvious, otherwise ask the model
+        tool_calls = yield _Op("route", user_message)
+        if tool_calls is None:
+            try:
+                response = yield _Op("complete", "first_completion", {
+                    "messages": [{"role": "system", "content": SYSTEM_PROMPT}, *valid_history],
+                    "tools": registry.select(user_message),
+                    "tool_choice": "auto",
+                })
+            except Exception as e:
+                print(f"[voice_chat] Chat completion failed: {str(e)}")
+
+                ai_message = yield _Op("wikipedia", user_message)
+                if ai_message is None:
+                    raise
+                session.append({"role": "assistant", "content": ai_message})
                 audio_output = None
                 if enable_tts and ai_message:
+                    yield _update(session, "🔊 Generating speech...")
                     print(f"[voice_chat] Generating speech from: {ai_message}")
-                    audio_output = tts_module.text_to_speech(ai_message)
-
-                chat_display = _build_chat_display(conversation_history)
-
-                status = "✅ Complete"
-                return chat_display, conversation_history, audio_output, status
-            raise
+                    audio_output = yield _Op("speak", ai_message, tts_backend)
+                yield _update(session, "✅ Complete", audio_output)
+                return
 
-        response_message = response.choices[0].message
+            response_message = response.choices[0].message
+            tool_calls = _normalize_tool_calls(getattr(response_message, "tool_calls", None))
 
         # Step 3: Handle tool calls
-        if getattr(response_message, "tool_calls", None):
+        if tool_calls:
             print("[voice_chat] Using tools...")
-            status = "🔧 Using tools..."
-            tool_call = response_message.tool_calls[0] if response_message.tool_calls else None
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
-
-            if function_name == "get_weather":
-                function_response = agents.get_weather(function_args["city"])
-            elif function_name == "calculate":
-                function_response = agents.calculate(function_args["expression"])
-            elif function_name == "get_world_time":
-                function_response = agents.get_world_time(function_args["city"])
-            elif function_name == "search_wikipedia":
-                function_response = agents.search_wikipedia(function_args["query"])
-            elif function_name == "get_news":
-                function_response = agents.get_news(function_args.get("category", "general"))
-            elif function_name == "convert_currency":
-                function_response = agents.convert_currency(
-                    function_args["amount"],
-                    function_args["from_currency"],
-                    function_args["to_currency"]
-                )
-            elif function_name == "get_definition":
-                function_response = agents.get_definition(function_args["word"])
-            else:
-                function_response = json.dumps({"error": "Unknown function"})
+            yield _update(session, "🔧 Using tools...")
+            results = yield _Op("tools", tool_calls)
 
-            final_messages = [
-                {"role": "system", "content": "You are a helpful voice assistant. Present information in a natural, conversational way. Keep responses concise."}
-            ]
-            final_messages.append({"role": "user", "content": user_message})
-            final_messages.append({
-                "role": "user",
-                "content": f"Based on this information: {function_response}, please provide a natural response."
-            })
+            # Structured results are phrased locally; only free-form ones need the model
+            ai_message = render.render_all(tool_calls, results, llm_rewrite)
+            if ai_message is None:
+                final_messages = _final_messages(valid_history, tool_calls, results)
 
-            try:
-                final_response = assistant.client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=final_messages,
-                    temperature=0.7,
-                    max_tokens=300
-                )
-                ai_message = final_response.choices[0].message.content
-            except Exception as e_final:
-                # If the final model call fails (tool-use / generation errors), fallback
-                print(f"[voice_chat] Final response creation failed: {str(e_final)}")
                 try:
-                    parsed = json.loads(function_response)
-                    if isinstance(parsed, dict) and "error" not in parsed:
-                        # Wikipedia-like result
-                        if "title" in parsed and "summary" in parsed:
-                            ai_message = f"{parsed.get('title')}: {parsed.get('summary')} (More: {parsed.get('url', '')})"
-                        # News headlines
-                        elif "headlines" in parsed:
-                            ai_message = "Top headlines: " + "; ".join(parsed.get('headlines', []))
-                        # Currency / simple numeric responses
-                        else:
-                            ai_message = str(parsed)
-                    else:
-                        ai_message = parsed.get("error") if isinstance(parsed, dict) else str(parsed)
-                except Exception:
-                    # As a last resort, return the raw function response string
-                    ai_message = function_response
+                    final_response = yield _Op("complete", "final_completion", {"messages": final_messages})
+                    ai_message = final_response.choices[0].message.content
+                except Exception as e_final:
+                    # If the final model call fails (tool-use / generation errors), fallback
+                    print(f"[voice_chat] Final response creation failed: {str(e_final)}")
+                    ai_message = _fallback_messages(results)
         else:
             ai_message = response_message.content
 
         print(f"[voice_chat] AI message: {ai_message}")
 
-        conversation_history.append({"role": "assistant", "content": ai_message})
+        session.append({"role": "assistant", "content": ai_message})
 
+        # Show the text reply while the speech is synthesized
         audio_output = None
         if enable_tts and ai_message:
+            yield _update(session, "🔊 Generating speech...")
             print(f"[voice_chat] Generating speech from: {ai_message}")
-            audio_output = tts_module.text_to_speech(ai_message)
+            audio_output = yield _Op("speak", ai_message, tts_backend)
+
+        yield _update(session, "✅ Complete", audio_output)
+
+    except Exception as e:
+        print(f"[voice_chat] Error in voice chat: {str(e)}")
+        error_msg = f"Error: {str(e)}"
+        session.append({"role": "assistant", "content": error_msg})
+        yield _update(session, "❌ Error")
+
+
+def _chunk_text(chunk, partial_calls, usage=None):
+    """Text delta of one streamed chunk; tool call fragments are gathered into partial_calls"""
+    # Groq reports token usage on the final chunk
+    x_groq = getattr(chunk, "x_groq", None)
+    if usage is not None and getattr(x_groq, "usage", None) is not None:
+        usage.update(_usage_attributes(x_groq.usage))
+    if not chunk.choices:
+        return None
+    delta = chunk.choices[0].delta
+    for tc in getattr(delta, "tool_calls", None) or []:
+        entry = partial_calls.setdefault(tc.index, {"id": None, "name": "", "arguments": ""})
+        if tc.id:
+            entry["id"] = tc.id
+        if tc.function is not None:
+            if tc.function.name:
+                entry["name"] += tc.function.name
+            if tc.function.arguments:
+                entry["arguments"] += tc.function.arguments
+    return getattr(delta, "content", None)
+
+
+def voice_chat_stream(audio, session_id, enable_tts, tts_backend=None, llm_rewrite=False):
+    """Streaming variant of voice_chat.
+
+    Consumes the completion token by token, cuts the reply at sentence
+    boundaries and sends each sentence to TTS while later tokens are still
+    arriving. Yields (chat, state, audio_chunk, status) tuples for Gradio.
+    """
+    # Gradio may resume the generator on another thread, so the turn span is
+    # passed explicitly rather than relied on as the current span
+    turn = tracing.start("turn", pipeline="stream", tts=bool(enable_tts))
+    deadline = resilience.expires_at()
+    try:
+        yield from _drive(_stream_steps(audio, session_id, enable_tts, tts_backend, llm_rewrite, turn, deadline),
+                          turn, deadline)
+    finally:
+        tracing.finish(turn)
+
+
+def _stream_steps(audio, session_id, enable_tts, tts_backend, llm_rewrite, turn, deadline):
+    """Steps of a streaming turn, shared by voice_chat_stream and voice_chat_stream_async"""
+    session = sessions.store.get(session_id)
+
+    if audio is None:
+        print("[voice_chat] No audio provided")
+        yield _update(session, "⚪ Ready")
+        return
+
+    text_parts = []
+    pending_audio = []
+    buffer = {"text": ""}
+
+    def on_text(delta):
+        text_parts.append(delta)
+        if not enable_tts:
+            return
+        buffer["text"] += delta
+        sentences, buffer["text"] = tts_module.split_sentences(buffer["text"])
+        with _stage(turn, deadline):
+            for sentence in sentences:
+                pending_audio.append(tts_module.text_to_speech_async(sentence, tts_backend))
+
+    def ready_audio():
+        # Release finished chunks strictly in sentence order
+        while pending_audio and pending_audio[0].done():
+            chunk = pending_audio.pop(0).result()
+            if chunk:
+                return chunk
+        return None
+
+    def partial_display(status):
+        chat_display = _build_chat_display(session.messages)
+        partial = "".join(text_parts)
+        if partial:
+            if chat_display and chat_display[-1][1] is None:
+                chat_display[-1][1] = partial
+            else:
+                chat_display.append([None, partial])
+        return chat_display, session.id, ready_audio(), status
+
+    def stream_completion(stage, tool_calls, **kwargs):
+        span = tracing.start(stage, parent=turn, model=MODEL, request_bytes=_request_size(kwargs),
+                             tools=len(kwargs.get("tools") or []))
+        usage, chars, partial_calls = {}, 0, {}
+        try:
+            stream = yield _Op("stream", kwargs)
+            while True:
+                chunk = yield _Op("next_chunk", stream)
+                if chunk is None:
+                    break
+                delta = _chunk_text(chunk, partial_calls, usage)
+                if not delta:
+                    continue
+                if not chars:
+                    span.set(first_token_ms=round((time.perf_counter() - span.start) * 1000, 1))
+                chars += len(delta)
+                on_text(delta)
+                yield partial_display("💬 Responding...")
+            tool_calls.extend(partial_calls[i] for i in sorted(partial_calls))
+        except Exception as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            tracing.finish(span, response_chars=chars, **usage)
+
+    try:
+        print("[voice_chat] Transcribing audio...")
+        yield _update(session, "🎤 Transcribing...")
+
+        user_message = yield _Op("transcribe", audio)
+        print(f"[voice_chat] Transcription: {user_message}")
+
+        if not _add_user_message(session, user_message):
+            yield _update(session, "⚪ Ready")
+            return
+
+        yield _update(session, "🤖 Processing...")
 
-        chat_display = _build_chat_display(conversation_history)
+        valid_history = _valid_history(session)
+        tool_calls = yield _Op("route", user_message)
+        if tool_calls is None:
+            tool_calls = []
+            try:
+                yield from stream_completion(
+                    "first_completion",
+                    tool_calls,
+                    messages=[{"role": "system", "content": SYSTEM_PROMPT}, *valid_history],
+                    tools=registry.select(user_message),
+                    tool_choice="auto",
+                )
+            except Exception as e:
+                print(f"[voice_chat] Chat completion failed: {str(e)}")
+                ai_message = yield _Op("wikipedia", user_message)
+                if ai_message is None:
+                    raise
+                on_text(ai_message)
+
+        if tool_calls:
+            print("[voice_chat] Using tools...")
+            yield partial_display("🔧 Using tools...")
+            tool_calls = _normalize_tool_calls(tool_calls)
+            results = yield _Op("tools", tool_calls)
+
+            # Drop any preamble the model produced before deciding to call a tool
+            text_parts.clear()
+            pending_audio.clear()
+            buffer["text"] = ""
+            rendered = render.render_all(tool_calls, results, llm_rewrite)
+            if rendered is not None:
+                on_text(rendered)
+            else:
+                try:
+                    yield from stream_completion(
+                        "final_completion", [], messages=_final_messages(valid_history, tool_calls, results)
+                    )
+                except Exception as e_final:
+                    print(f"[voice_chat] Final response creation failed: {str(e_final)}")
+                    on_text(_fallback_messages(results))
+
+        # Flush the trailing fragment that has no sentence terminator
+        if enable_tts and buffer["text"].strip():
+            with _stage(turn, deadline):
+                pending_audio.append(tts_module.text_to_speech_async(buffer["text"].strip(), tts_backend))
+            buffer["text"] = ""
+
+        ai_message = "".join(text_parts).strip()
+        print(f"[voice_chat] AI message: {ai_message}")
+        session.append({"role": "assistant", "content": ai_message})
+        chat_display = _build_chat_display(session.messages)
 
-        status = "✅ Complete"
-        return chat_display, conversation_history, audio_output, status
+        while pending_audio:
+            chunk = yield _Op("wait", pending_audio.pop(0))
+            if chunk:
+                yield chat_display, session.id, chunk, "🔊 Speaking..."
+
+        yield chat_display, session.id, None, "✅ Complete"
 
     except Exception as e:
         print(f"[voice_chat] Error in voice chat: {str(e)}")
         error_msg = f"Error: {str(e)}"
-        conversation_history.append({"role": "assistant", "content": error_msg})
-        chat_display = _build_chat_display(conversation_history)
-        return chat_display, conversation_history, None, "❌ Error"
+        session.append({"role": "assistant", "content": error_msg})
+        yield _update(session, "❌ Error")
+
+
+def _busy(session_id):
+    session = sessions.store.get(session_id)
+    return _build_chat_display(session.messages), session.id, None, BUSY_STATUS
+
+
+def respond(audio, session_id, enable_tts, stream_response, tts_backend=None, llm_rewrite=False):
+    """Gradio entry point that picks the streaming or staged pipeline"""
+    session = sessions.store.get(session_id)
+    # One turn per session at a time, so a single client cannot hold several queue slots
+    if not session.begin_turn():
+        yield _busy(session.id)
+        return
+    try:
+        if stream_response:
+            yield from voice_chat_stream(audio, session.id, enable_tts, tts_backend, llm_rewrite)
+        else:
+            yield from voice_chat_updates(audio, session.id, enable_tts, tts_backend, llm_rewrite)
+    finally:
+        session.end_turn()
+
+
+def live_transcript(chunk, session_id):
+    """Streaming-input handler: feed a microphone chunk and show the transcript so far"""
+    session = sessions.store.get(session_id)
+    listen.feed(session.id, chunk)
+    chat_display = _build_chat_display(session.messages)
+    text = listen.partial(session.id)
+    chat_display.append([f"🎙️ {text} …" if text else "🎙️ …", None])
+    return chat_display, session.id, "🎙️ Listening..."
+
+
+def respond_live(session_id, enable_tts, stream_response, tts_backend=None, llm_rewrite=False):
+    """Stop handler for streaming input: run the turn on the live recording"""
+    session = sessions.store.get(session_id)
+    yield from respond(listen.finish(session.id), session.id, enable_tts, stream_response, tts_backend, llm_rewrite)
 
 
-def clear_conversation():
-    assistant.conversation_history = []
-    return [], [], None, "⚪ Ready"
+def clear_conversation(session_id):
+    session = sessions.store.get(session_id)
+    session.clear()
+    return [], session.id, None, "⚪ Ready"
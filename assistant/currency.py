@@ -0,0 +1,131 @@
+"""Currency conversion from a single base-rate table.
+
+exchangerate-api returns every rate relative to one base currency, so one
+table is enough to derive any pair: ``rate(A -> B) = rates[B] / rates[A]``.
+The table for BASE (ASSISTANT_CURRENCY_BASE, default USD) is kept warm by
+assistant.prefetch and refreshed every REFRESH_INTERVAL seconds, so
+conversions are local arithmetic. Amounts use Decimal and are rounded
+half-even to the target currency's minor unit (0 places for JPY, 3 for KWD).
+
+``convert_many`` converts a batch of (amount, from, to) triples against one
+table snapshot, e.g. "100 dollars to euros, pounds and yen".
+"""
+
+import os
+import re
+import threading
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+
+from assistant import prefetch
+
+BASE = os.environ.get("ASSISTANT_CURRENCY_BASE", "USD").upper()
+REFRESH_INTERVAL = float(os.environ.get("ASSISTANT_CURRENCY_REFRESH", str(60 * 60)))
+# Significant decimal places reported for a cross rate
+RATE_PLACES = 6
+
+# ISO 4217 minor units that differ from the usual 2
+MINOR_UNITS = {
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0, "KMF": 0, "KRW": 0, "PYG": 0,
+    "RWF": 0, "UGX": 0, "UYI": 0, "VND": 0, "VUV": 0, "XAF": 0, "XOF": 0, "XPF": 0,
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3, "TND": 3,
+}
+
+_SPLIT = re.compile(r"\s*(?:,\s*and\s+|,|\band\b|&|/)\s*", re.I)
+
+# Decimal view of the last snapshot, rebuilt only when prefetch swaps it
+_table_lock = threading.Lock()
+_table_source = None
+_table = None
+
+
+def rates_url(base=BASE):
+    return f"https://api.exchangerate-api.com/v4/latest/{base.upper()}"
+
+
+def split_codes(text):
+    """Split "EUR, GBP and JPY" into ["EUR", "GBP", "JPY"]"""
+    return [part.strip().upper() for part in _SPLIT.split(str(text).strip()) if part.strip()]
+
+
+def _decimal_table(snapshot):
+    global _table_source, _table
+    with _table_lock:
+        if snapshot is not _table_source:
+            data = snapshot.json()
+            rates = {code.upper(): Decimal(str(value)) for code, value in data["rates"].items()}
+            rates.setdefault(data.get("base", BASE).upper(), Decimal(1))
+            _table_source, _table = snapshot, rates
+        return _table
+
+
+def _table_from(snapshot):
+    if snapshot.status_code != 200:
+        raise LookupError("Could not fetch exchange rates")
+    return _decimal_table(snapshot)
+
+
+def table():
+    """Current {code: Decimal rate against BASE}"""
+    return _table_from(prefetch.get(rates_url(), REFRESH_INTERVAL))
+
+
+async def atable():
+    """Asyncio counterpart of ``table``"""
+    return _table_from(await prefetch.aget(rates_url(), REFRESH_INTERVAL))
+
+
+def quantize(value, code):
+    places = MINOR_UNITS.get(code, 2)
+    return value.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_EVEN)
+
+
+def _rate_value(rate):
+    # Keep RATE_PLACES significant digits after any leading zeros (0.00662 stays readable)
+    exponent = rate.adjusted() - RATE_PLACES + 1
+    return float(rate.quantize(Decimal(1).scaleb(min(exponent, -RATE_PLACES)), rounding=ROUND_HALF_EVEN))
+
+
+def cross_rate(rates, from_currency, to_currency):
+    """Units of ``to_currency`` per one ``from_currency``; raises KeyError for unknown codes"""
+    return rates[to_currency] / rates[from_currency]
+
+
+def convert_many(conversions, rates=None):
+    """Convert (amount, from, to) triples in one pass over a single table.
+
+    Returns one dict per triple, in order; unknown currencies or amounts give
+    an entry with an "error" key instead of failing the batch.
+    """
+    if rates is None:
+        rates = table()
+    results = []
+    for amount, from_currency, to_currency in conversions:
+        from_code, to_code = str(from_currency).strip().upper(), str(to_currency).strip().upper()
+        missing = next((code for code in (from_code, to_code) if code not in rates), None)
+        if missing:
+            results.append({"to_currency": to_code, "error": f"Currency {missing} not found"})
+            continue
+        try:
+            value = Decimal(str(amount))
+        except InvalidOperation:
+            results.append({"to_currency": to_code, "error": f"Invalid amount {amount!r}"})
+            continue
+        rate = cross_rate(rates, from_code, to_code)
+        results.append({
+            "original_amount": amount,
+            "from_currency": from_code,
+            "to_currency": to_code,
+            "converted_amount": float(quantize(value * rate, to_code)),
+            "exchange_rate": _rate_value(rate),
+        })
+    return results
+
+
+def convert(amount, from_currency, to_currency, rates=None):
+    """Single conversion; see ``convert_many``"""
+    return convert_many([(amount, from_currency, to_currency)], rates)[0]
+
+
+def stats():
+    with _table_lock:
+        return {"base": BASE, "currencies": len(_table) if _table else 0}
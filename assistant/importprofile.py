@@ -0,0 +1,100 @@
+"""Import-time profile of the assistant package.
+
+Runs a fresh interpreter with ``-X importtime``, then reports the wall time,
+the cost per top-level package and the slowest individual modules:
+
+    python -m assistant.importprofile                     # import assistant.ui
+    python -m assistant.importprofile assistant.core --top 10
+    python -m assistant.importprofile --build-ui --json   # include create_demo()
+
+Use it to check that a change keeps heavy dependencies (groq, gradio,
+httpx, gtts) off the import path until they are first used.
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(modules=("assistant.ui",), build_ui=False, python=sys.executable):
+    """Import ``modules`` in a child interpreter; returns (wall seconds, per-module entries)"""
+    code = ["import time", "_t = time.perf_counter()"]
+    code += [f"import {module}" for module in modules]
+    if build_ui:
+        code.append("import assistant.ui; assistant.ui.create_demo()")
+    code.append("print(time.perf_counter() - _t)")
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", "\n".join(code)],
+        capture_output=True, text=True, timeout=600,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    entries = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            entries.append({
+                "module": m.group(4),
+                "self_ms": int(m.group(1)) / 1000,
+                "cumulative_ms": int(m.group(2)) / 1000,
+                "depth": len(m.group(3)) // 2,
+            })
+    return float(proc.stdout.strip().splitlines()[-1]), entries
+
+
+def summarize(wall, entries, top=15):
+    packages = {}
+    for entry in entries:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0.0) + entry["self_ms"]
+    return {
+        "wall_ms": round(wall * 1000, 1),
+        "modules": len(entries),
+        "packages": [
+            {"package": name, "ms": round(ms, 1)}
+            for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        "slowest_modules": [
+            {"module": e["module"], "self_ms": round(e["self_ms"], 1)}
+            for e in sorted(entries, key=lambda e: -e["self_ms"])[:top]
+        ],
+        "assistant_modules": [
+            {"module": e["module"], "cumulative_ms": round(e["cumulative_ms"], 1)}
+            for e in entries if e["module"].startswith("assistant")
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report what each module costs at import time")
+    parser.add_argument("modules", nargs="*", default=["assistant.ui"])
+    parser.add_argument("--build-ui", action="store_true", help="also time create_demo()")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    wall, entries = profile(args.modules, args.build_ui)
+    report = summarize(wall, entries, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"Imported {', '.join(args.modules)} in {report['wall_ms']} ms ({report['modules']} modules)\n")
+    print("By package (self time):")
+    for row in report["packages"]:
+        print(f"  {row['ms']:>9.1f} ms  {row['package']}")
+    print("\nSlowest modules (self time):")
+    for row in report["slowest_modules"]:
+        print(f"  {row['self_ms']:>9.1f} ms  {row['module']}")
+    print("\nassistant modules (cumulative):")
+    for row in report["assistant_modules"]:
+        print(f"  {row['cumulative_ms']:>9.1f} ms  {row['module']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
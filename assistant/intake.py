@@ -0,0 +1,178 @@
+"""Audio intake: shrink a recording before it is uploaded for transcription.
+
+Browser recordings arrive as 44.1/48 kHz WAV, often stereo, with silence
+on both ends. Whisper resamples everything to 16 kHz mono anyway, so
+``prepare`` trims leading and trailing silence (keeping PAD_MS), downmixes,
+resamples to 16 kHz 16-bit and encodes as FLAC when ffmpeg is available
+(plain 16 kHz WAV otherwise). A 5 s stereo 48 kHz recording goes from
+~960 KB to ~160 KB as WAV, or about half that as FLAC.
+
+Each clip carries a fingerprint, a hash of its normalized PCM, so the same
+recording submitted again (a retry, a double-fired stop event, the same
+audio under another file name) is answered from the "transcripts" cache by
+``transcribe``/``atranscribe``; identical uploads in flight at the same
+time share one request. Recordings that are silence only are never sent.
+
+ASSISTANT_INTAKE=0 uploads files unchanged (still fingerprinted and cached).
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import threading
+
+from assistant import cache, singleflight
+
+ENABLED = os.environ.get("ASSISTANT_INTAKE", "1") != "0"
+SAMPLE_RATE = 16000
+# "flac" needs ffmpeg; without it clips are sent as 16 kHz WAV
+FORMAT = os.environ.get("ASSISTANT_INTAKE_FORMAT", "flac").lower()
+# Audio quieter than the clip's peak by this much counts as silence
+SILENCE_DB = float(os.environ.get("ASSISTANT_INTAKE_SILENCE_DB", "35"))
+# Silence kept around the speech so word onsets and endings are not clipped
+PAD_MS = 200
+TRANSCRIPT_TTL = int(os.environ.get("ASSISTANT_TRANSCRIPT_TTL", str(60 * 60)))
+
+_transcripts = cache.get_cache("transcripts", TRANSCRIPT_TTL)
+_flight = singleflight.group("transcripts")
+_totals = {"clips": 0, "original_bytes": 0, "upload_bytes": 0, "trimmed_ms": 0, "silent": 0, "unprocessed": 0}
+_totals_lock = threading.Lock()
+
+
+class Clip:
+    """A recording ready for upload"""
+
+    def __init__(self, name, data, fingerprint, original_bytes, duration_ms=None, trimmed_ms=0):
+        self.name = name
+        self.data = data
+        self.fingerprint = fingerprint
+        self.original_bytes = original_bytes
+        self.duration_ms = duration_ms
+        self.trimmed_ms = trimmed_ms
+
+    @property
+    def silent(self):
+        return not self.data
+
+    def attributes(self):
+        """Span attributes describing what intake did to the recording"""
+        return {
+            "audio_bytes": self.original_bytes,
+            "upload_bytes": len(self.data),
+            "duration_ms": self.duration_ms,
+            "trimmed_ms": self.trimmed_ms,
+        }
+
+
+def _format():
+    return FORMAT if FORMAT == "wav" or shutil.which("ffmpeg") else "wav"
+
+
+def _upload_name(path, fmt):
+    return f"{os.path.splitext(os.path.basename(path))[0]}.{fmt}"
+
+
+def _trim(segment):
+    """Cut leading and trailing silence down to PAD_MS; returns (segment, ms removed)"""
+    from pydub.silence import detect_leading_silence
+
+    if segment.max_dBFS == float("-inf"):
+        return segment[:0], len(segment)
+    threshold = segment.max_dBFS - SILENCE_DB
+    lead = detect_leading_silence(segment, silence_threshold=threshold, chunk_size=10)
+    tail = detect_leading_silence(segment.reverse(), silence_threshold=threshold, chunk_size=10)
+    start = max(lead - PAD_MS, 0)
+    end = min(len(segment) - tail + PAD_MS, len(segment))
+    if end <= start:
+        return segment[:0], len(segment)
+    return segment[start:end], len(segment) - (end - start)
+
+
+def _count(**amounts):
+    with _totals_lock:
+        for name, amount in amounts.items():
+            _totals[name] += amount
+
+
+def _unprocessed(path, data):
+    _count(clips=1, original_bytes=len(data), upload_bytes=len(data), unprocessed=1)
+    return Clip(os.path.basename(path), data, hashlib.sha256(data).hexdigest(), len(data))
+
+
+def prepare(path):
+    """Read ``path`` and return a trimmed, 16 kHz mono, compressed Clip"""
+    with open(path, "rb") as file:
+        raw = file.read()
+    if not ENABLED:
+        return _unprocessed(path, raw)
+    # pydub is only needed once a recording arrives
+    from pydub import AudioSegment
+
+    try:
+        # WAV is decoded in-process; anything else goes through ffmpeg
+        fmt = "wav" if raw[:4] == b"RIFF" and raw[8:12] == b"WAVE" else None
+        segment = AudioSegment.from_file(io.BytesIO(raw), format=fmt)
+    except Exception as e:
+        print(f"[voice_chat] Audio intake could not decode {os.path.basename(path)}: {e}")
+        return _unprocessed(path, raw)
+
+    segment = segment.set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2)
+    segment, trimmed_ms = _trim(segment)
+    fingerprint = hashlib.sha256(segment.raw_data).hexdigest()
+    if not len(segment):
+        _count(clips=1, original_bytes=len(raw), trimmed_ms=trimmed_ms, silent=1)
+        return Clip(os.path.basename(path), b"", fingerprint, len(raw), 0, trimmed_ms)
+
+    fmt = _format()
+    data = segment.export(io.BytesIO(), format=fmt).getvalue()
+    name = _upload_name(path, fmt)
+    if len(data) >= len(raw):
+        # Already compact (e.g. short 16 kHz mono WAV without silence)
+        data, name = raw, os.path.basename(path)
+    _count(clips=1, original_bytes=len(raw), upload_bytes=len(data), trimmed_ms=trimmed_ms)
+    return Clip(name, data, fingerprint, len(raw), len(segment), trimmed_ms)
+
+
+def _store(key, text):
+    _transcripts.set(key, text)
+    return text
+
+
+def _request(key, upload, clip):
+    return _store(key, upload(clip.name, clip.data))
+
+
+async def _arequest(key, upload, clip):
+    return _store(key, await upload(clip.name, clip.data))
+
+
+def cached(clip):
+    """(hit, transcript) for a clip that was transcribed before"""
+    if clip.silent:
+        return True, ""
+    return _transcripts.get(clip.fingerprint)
+
+
+def transcribe(clip, upload):
+    """(transcript, cache hit) for ``clip``; ``upload(name, data)`` runs only on a miss"""
+    hit, text = cached(clip)
+    if hit:
+        return text, True
+    return _flight.do(clip.fingerprint, _request, clip.fingerprint, upload, clip), False
+
+
+async def atranscribe(clip, upload):
+    """Asyncio counterpart of ``transcribe`` for an ``async def upload``"""
+    hit, text = cached(clip)
+    if hit:
+        return text, True
+    return await _flight.ado(clip.fingerprint, _arequest, clip.fingerprint, upload, clip), False
+
+
+def stats():
+    with _totals_lock:
+        totals = dict(_totals)
+    totals["format"] = _format() if ENABLED else None
+    totals["saved_bytes"] = totals["original_bytes"] - totals["upload_bytes"]
+    return totals
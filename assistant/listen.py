@@ -0,0 +1,216 @@
+"""Live microphone input: voice-activity segmentation and background transcription.
+
+With ASSISTANT_STREAMING_INPUT=1 the UI streams microphone chunks here
+while the user talks. An energy-based VAD cuts the stream at pauses
+(VAD_SILENCE_MS of silence after at least VAD_MIN_SPEECH_MS of speech) and
+each finished segment is transcribed on a worker thread while recording
+continues. ``partial`` returns the text of the segments transcribed so far
+for the live transcript; ``finish`` submits the last segment and returns an
+``Utterance`` whose ``wait`` joins every segment's text in order, so at stop
+time only the final segment is still outstanding.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+FRAME_MS = 30
+VAD_SILENCE_MS = int(os.environ.get("ASSISTANT_VAD_SILENCE_MS", "700"))
+VAD_MIN_SPEECH_MS = int(os.environ.get("ASSISTANT_VAD_MIN_SPEECH_MS", "250"))
+# Floor for the speech threshold on a 0..1 RMS scale; the rest adapts to the room
+VAD_MIN_RMS = float(os.environ.get("ASSISTANT_VAD_MIN_RMS", "0.01"))
+MAX_SEGMENT_S = float(os.environ.get("ASSISTANT_VAD_MAX_SEGMENT_S", "15"))
+# Silence kept before speech so word onsets are not clipped
+PREROLL_MS = 200
+# Recordings nobody finished (closed tab, lost stop event) are dropped after this
+IDLE_SECONDS = 300
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ASSISTANT_SEGMENT_WORKERS", "4")),
+    thread_name_prefix="segment",
+)
+_recordings = {}
+_recordings_lock = threading.Lock()
+
+
+def _to_mono_float(data):
+    import numpy as np
+
+    samples = np.asarray(data)
+    if np.issubdtype(samples.dtype, np.integer):
+        samples = samples.astype(np.float32) / float(np.iinfo(samples.dtype).max + 1)
+    else:
+        samples = samples.astype(np.float32)
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+
+def _write_wav(samples, rate):
+    import numpy as np
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    handle, path = tempfile.mkstemp(prefix="segment-", suffix=".wav")
+    with os.fdopen(handle, "wb") as file, wave.open(file, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return path
+
+
+def _transcribe_segment(path):
+    # Imported here: assistant.core imports this module
+    from assistant.core import _transcribe
+
+    try:
+        return _transcribe(path, stage="segment_transcription")
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class Utterance:
+    """Everything said during one recording, as ordered segment transcriptions"""
+
+    def __init__(self, futures):
+        self.futures = futures
+
+    @property
+    def segments(self):
+        return len(self.futures)
+
+    def partial(self):
+        """Text of the leading segments that are already transcribed"""
+        texts = []
+        for future in self.futures:
+            if not future.done() or future.exception() is not None:
+                break
+            texts.append(future.result())
+        return " ".join(t for t in texts if t)
+
+    def wait(self, timeout=None):
+        """Full transcript; raises the first segment's transcription error"""
+        return " ".join(t for t in (f.result(timeout) for f in self.futures) if t).strip()
+
+
+class Recording:
+    """Streaming VAD state for one session's current recording"""
+
+    def __init__(self):
+        self.rate = None
+        self.frame = 0
+        self.noise = None
+        self.pending = None        # samples short of a whole frame
+        self.segment = []          # frames of the current segment
+        self.speech_frames = 0
+        self.silent_frames = 0
+        self.futures = []
+        self.updated = time.time()
+        self._lock = threading.Lock()
+
+    def _threshold(self):
+        return max(VAD_MIN_RMS, (self.noise or 0.0) * 3)
+
+    def _cut(self):
+        import numpy as np
+
+        if self.speech_frames * FRAME_MS >= VAD_MIN_SPEECH_MS:
+            # Trailing silence beyond the pre-roll length only costs upload time
+            extra = self.silent_frames - PREROLL_MS // FRAME_MS
+            if extra > 0:
+                del self.segment[-extra:]
+            path = _write_wav(np.concatenate(self.segment), self.rate)
+            self.futures.append(_executor.submit(_transcribe_segment, path))
+        self.segment, self.speech_frames, self.silent_frames = [], 0, 0
+
+    def feed(self, rate, data):
+        # numpy is only needed once live input is used
+        import numpy as np
+
+        with self._lock:
+            self.updated = time.time()
+            if self.rate is None:
+                self.rate, self.frame = rate, max(1, rate * FRAME_MS // 1000)
+            samples = _to_mono_float(data)
+            if self.pending is not None:
+                samples = np.concatenate([self.pending, samples])
+            usable = len(samples) - len(samples) % self.frame
+            self.pending = samples[usable:]
+            preroll = max(1, PREROLL_MS // FRAME_MS)
+            for start in range(0, usable, self.frame):
+                frame = samples[start:start + self.frame]
+                rms = float(np.sqrt(np.mean(frame * frame)))
+                speech = rms >= self._threshold()
+                self.segment.append(frame)
+                if speech:
+                    self.speech_frames += 1
+                    self.silent_frames = 0
+                    continue
+                # Track the background level from non-speech frames only
+                self.noise = rms if self.noise is None else 0.95 * self.noise + 0.05 * rms
+                if not self.speech_frames:
+                    del self.segment[:-preroll]
+                    continue
+                self.silent_frames += 1
+                if self.silent_frames * FRAME_MS >= VAD_SILENCE_MS:
+                    self._cut()
+            if self.speech_frames and len(self.segment) * FRAME_MS >= MAX_SEGMENT_S * 1000:
+                self._cut()
+
+    def finish(self):
+        with self._lock:
+            if self.speech_frames:
+                if self.pending is not None and len(self.pending):
+                    self.segment.append(self.pending)
+                self._cut()
+            return Utterance(list(self.futures))
+
+    def partial(self):
+        with self._lock:
+            return Utterance(list(self.futures)).partial()
+
+
+def _sweep(now):
+    for key in [k for k, r in _recordings.items() if now - r.updated > IDLE_SECONDS]:
+        del _recordings[key]
+
+
+def feed(session_id, chunk):
+    """Add one streamed (sample_rate, samples) chunk to the session's recording"""
+    if chunk is None:
+        return
+    rate, data = chunk
+    with _recordings_lock:
+        _sweep(time.time())
+        recording = _recordings.get(session_id)
+        if recording is None:
+            recording = _recordings[session_id] = Recording()
+    recording.feed(rate, data)
+
+
+def partial(session_id):
+    """Transcript of the finished segments of the current recording"""
+    with _recordings_lock:
+        recording = _recordings.get(session_id)
+    return recording.partial() if recording is not None else ""
+
+
+def finish(session_id):
+    """End the session's recording; returns its Utterance (empty if nothing was said)"""
+    with _recordings_lock:
+        recording = _recordings.pop(session_id, None)
+    return recording.finish() if recording is not None else Utterance([])
+
+
+def discard(session_id):
+    with _recordings_lock:
+        _recordings.pop(session_id, None)
+
+
+def stats():
+    with _recordings_lock:
+        return {"recordings": len(_recordings)}
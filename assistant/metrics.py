@@ -0,0 +1,22 @@
+"""Process-wide counters served by the /metrics endpoints."""
+
+from assistant import cache, intake, listen, prefetch, registry, resilience, router, sessions, singleflight, tracing
+from assistant import tts as tts_module
+
+
+def snapshot():
+    """Per-stage latency percentiles plus every agent, cache, breaker and session counter"""
+    return {
+        "stages": tracing.percentiles(),
+        "last_turn": tracing.last_trace(),
+        "tools": registry.stats(),
+        "router": router.stats(),
+        "cache": cache.stats(),
+        "coalescing": singleflight.stats(),
+        "breakers": resilience.stats(),
+        "prefetch": prefetch.stats(),
+        "tts_cache": tts_module.cache_stats(),
+        "sessions": sessions.store.stats(),
+        "live_input": listen.stats(),
+        "audio_intake": intake.stats(),
+    }
@@ -0,0 +1,288 @@
+"""Background prefetch with stale-while-revalidate for slow-changing feeds.
+
+The BBC RSS feed and the exchange-rate tables change slowly, so instead of
+downloading them per tool call they are kept as in-memory snapshots:
+
+* ``register(url, interval)`` marks a URL to be kept warm; once ``start()``
+  runs (or the first read happens) a daemon thread refreshes every
+  registered URL whenever its snapshot is ``interval`` old.
+* ``get(url)`` / ``aget(url)`` return the current snapshot at once. A stale
+  snapshot is still served while the scheduler revalidates it; only a URL
+  with no snapshot yet is fetched inline (coalesced per URL).
+* Refreshes are conditional GETs (If-None-Match / If-Modified-Since), so an
+  unchanged feed costs a 304 instead of a full download.
+
+Snapshots answer ``status_code``, ``content``, ``headers`` and ``json()``
+like an httpx response, so the agents' parsers take either. A failed refresh
+keeps the last good snapshot until it is MAX_STALE old. Set
+ASSISTANT_PREFETCH=0 to disable the background thread; stale snapshots are
+then revalidated inline on access.
+"""
+
+import json
+import os
+import threading
+import time
+
+from assistant import singleflight, transport
+
+ENABLED = os.environ.get("ASSISTANT_PREFETCH", "1") != "0"
+# Serve nothing older than this if refreshes keep failing (seconds)
+MAX_STALE = float(os.environ.get("ASSISTANT_PREFETCH_MAX_STALE", str(24 * 60 * 60)))
+# Back-off before retrying a failed refresh (seconds)
+RETRY_AFTER = float(os.environ.get("ASSISTANT_PREFETCH_RETRY", "30"))
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+_wakeup = threading.Event()
+_flight = singleflight.group("prefetch")
+_scheduler = None
+_stopping = False
+
+
+class Snapshot:
+    """Immutable copy of a successful response"""
+
+    def __init__(self, status_code, content, headers):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self._json = None
+        self._json_lock = threading.Lock()
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        # Parsed once per snapshot; rate tables are read on every conversion
+        if self._json is None:
+            with self._json_lock:
+                if self._json is None:
+                    self._json = json.loads(self.content)
+        return self._json
+
+
+class Feed:
+    """One prefetched URL with its snapshot, validators and counters"""
+
+    def __init__(self, url, interval, warm):
+        self.url = url
+        self.interval = interval
+        self.warm = warm
+        self.snapshot = None
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = 0.0    # last time the snapshot was confirmed current
+        self.failed_at = 0.0
+        self.stale_requested = False
+        self.refreshes = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.served = 0
+        self.served_stale = 0
+        self.last_error = None
+
+    def age(self, now=None):
+        return (now or time.time()) - self.fetched_at
+
+    def is_stale(self, now=None):
+        return self.age(now) >= self.interval
+
+    def is_due(self, now):
+        if self.snapshot is None and not self.warm:
+            return False
+        if now - self.failed_at < RETRY_AFTER:
+            return False
+        return self.stale_requested or (self.warm and self.is_stale(now))
+
+    def conditional_headers(self):
+        headers = {}
+        if self.snapshot is not None:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def apply(self, response):
+        """Update from a response; returns the snapshot to serve"""
+        now = time.time()
+        self.refreshes += 1
+        self.stale_requested = False
+        if response.status_code == 304 and self.snapshot is not None:
+            self.not_modified += 1
+            self.fetched_at = now
+            return self.snapshot
+        snapshot = Snapshot(response.status_code, response.content, dict(response.headers))
+        if response.status_code != 200:
+            self.errors += 1
+            self.failed_at = now
+            self.last_error = f"HTTP {response.status_code}"
+            # Keep serving the last good copy; hand the failure to the caller only when there is none
+            return self.snapshot if self.usable(now) else snapshot
+        self.snapshot = snapshot
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.fetched_at = now
+        self.last_error = None
+        return snapshot
+
+    def fail(self, error):
+        self.errors += 1
+        self.failed_at = time.time()
+        self.stale_requested = False
+        self.last_error = str(error)
+
+    def usable(self, now=None):
+        return self.snapshot is not None and self.age(now) < MAX_STALE
+
+    def stats(self):
+        return {
+            "warm": self.warm,
+            "interval": self.interval,
+            "age_s": round(self.age(), 1) if self.snapshot is not None else None,
+            "bytes": len(self.snapshot.content) if self.snapshot is not None else 0,
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "served": self.served,
+            "served_stale": self.served_stale,
+            "last_error": self.last_error,
+        }
+
+
+def register(url, interval, warm=True):
+    """Track ``url``; warm feeds are refreshed in the background every ``interval`` seconds"""
+    with _feeds_lock:
+        feed = _feeds.get(url)
+        if feed is None:
+            feed = _feeds[url] = Feed(url, interval, warm)
+        else:
+            feed.interval = min(feed.interval, interval)
+            feed.warm = feed.warm or warm
+    return feed
+
+
+def _feed(url, interval):
+    with _feeds_lock:
+        feed = _feeds.get(url)
+    # URLs nobody registered are tracked too, but only revalidated when read
+    return feed if feed is not None else register(url, interval, warm=False)
+
+
+def _refresh(feed):
+    try:
+        response = transport.get(feed.url, headers=feed.conditional_headers())
+    except Exception as e:
+        feed.fail(e)
+        if feed.usable():
+            return feed.snapshot
+        raise
+    return feed.apply(response)
+
+
+async def _arefresh(feed):
+    try:
+        response = await transport.aget(feed.url, headers=feed.conditional_headers())
+    except Exception as e:
+        feed.fail(e)
+        if feed.usable():
+            return feed.snapshot
+        raise
+    return feed.apply(response)
+
+
+def _serve(feed):
+    """Return the snapshot if it can be served now, flagging it for revalidation when stale"""
+    now = time.time()
+    if not feed.usable(now):
+        return None
+    if feed.is_stale(now):
+        if not ENABLED:
+            return None
+        feed.served_stale += 1
+        feed.stale_requested = True
+        _wakeup.set()
+    feed.served += 1
+    return feed.snapshot
+
+
+def get(url, interval=300):
+    """Current snapshot of ``url``; fetched inline only when there is nothing to serve"""
+    start()
+    feed = _feed(url, interval)
+    snapshot = _serve(feed)
+    if snapshot is not None:
+        return snapshot
+    return _flight.do(url, _refresh, feed)
+
+
+async def aget(url, interval=300):
+    """Asyncio counterpart of ``get``"""
+    start()
+    feed = _feed(url, interval)
+    snapshot = _serve(feed)
+    if snapshot is not None:
+        return snapshot
+    return await _flight.ado(url, _arefresh, feed)
+
+
+def _run():
+    while not _stopping:
+        now = time.time()
+        with _feeds_lock:
+            feeds = list(_feeds.values())
+        for feed in feeds:
+            if _stopping:
+                return
+            if feed.is_due(now):
+                try:
+                    _flight.do(feed.url, _refresh, feed)
+                except Exception as e:
+                    print(f"[voice_chat] Prefetch of {feed.url} failed: {e}")
+        # Sleep until the next warm feed is due, or until a stale read asks for a refresh
+        waits = [max(feed.interval - feed.age(), 0.0) for feed in feeds if feed.warm and feed.snapshot is not None]
+        if any(feed.failed_at for feed in feeds):
+            waits.append(RETRY_AFTER)
+        _wakeup.wait(min(waits + [60.0]) if waits else 1.0)
+        _wakeup.clear()
+
+
+def start():
+    """Start the background scheduler if it is enabled and not running"""
+    global _scheduler, _stopping
+    if not ENABLED or (_scheduler is not None and _scheduler.is_alive()):
+        return
+    with _feeds_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            _stopping = False
+            _scheduler = threading.Thread(target=_run, name="prefetch-scheduler", daemon=True)
+            _scheduler.start()
+
+
+def stop():
+    """Stop the background scheduler (``start`` or the next read restarts it)"""
+    global _stopping
+    _stopping = True
+    _wakeup.set()
+    if _scheduler is not None:
+        _scheduler.join(timeout=5)
+
+
+def refresh_all():
+    """Revalidate every tracked feed now, in the calling thread"""
+    with _feeds_lock:
+        feeds = list(_feeds.values())
+    for feed in feeds:
+        try:
+            _flight.do(feed.url, _refresh, feed)
+        except Exception as e:
+            print(f"[voice_chat] Prefetch of {feed.url} failed: {e}")
+
+
+def stats():
+    """Per-URL snapshot age and refresh counters"""
+    with _feeds_lock:
+        feeds = list(_feeds.values())
+    return {feed.url: feed.stats() for feed in feeds}
@@ -0,0 +1,283 @@
+"""Declarative registry of the agent tools.
+
+Each agent is registered once, next to its implementation, with the JSON
+schema of its arguments, a timeout, a concurrency limit, an optional cache
+policy and the keywords that make it relevant to an utterance:
+
+    @registry.tool(
+        "get_weather", "Get current weather information for a city...",
+        params={"city": {"type": "string", "description": "The city name"}},
+        cache=("weather", WEATHER_TTL), keywords=("weather", "temperature"),
+    )
+    def get_weather(city): ...
+
+The tool list sent to the model is generated from the registry, dispatch is
+a dict lookup, arguments are validated before the agent runs and every call
+is timed. ``select`` returns only the tools an utterance can plausibly need,
+which keeps the tool-selection prompt small.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from assistant import resilience, tracing
+from assistant.cache import cached, is_error
+
+DEFAULT_TIMEOUT = float(os.environ.get("ASSISTANT_TOOL_TIMEOUT", "8"))
+DEFAULT_CONCURRENCY = int(os.environ.get("ASSISTANT_TOOL_CONCURRENCY", "4"))
+SELECTION_ENABLED = os.environ.get("ASSISTANT_TOOL_SELECTION", "1") == "1"
+
+_TYPES = {
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+}
+
+
+class ToolArgumentError(ValueError):
+    pass
+
+
+class Tool:
+    """One registered agent and its dispatch policy"""
+
+    def __init__(self, name, func, description, params, timeout, concurrency, cache, keywords):
+        self.name = name
+        self.func = func
+        self.async_func = None
+        self.description = description
+        self.params = params
+        self.timeout = timeout
+        self.keywords = tuple(k.lower() for k in keywords)
+        self.cache = cache
+        self.concurrency = concurrency
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._async_semaphore = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=500)
+        self._counts = {"calls": 0, "errors": 0, "timeouts": 0}
+
+    def schema(self):
+        required = [name for name, spec in self.params.items() if "default" not in spec]
+        parameters = {"type": "object", "properties": self.params}
+        if required:
+            parameters["required"] = required
+        return {
+            "type": "function",
+            "function": {"name": self.name, "description": self.description, "parameters": parameters},
+        }
+
+    def validate(self, arguments):
+        """Positional argument list for the agent, coercing what the model got slightly wrong"""
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments or "{}")
+            except ValueError:
+                raise ToolArgumentError("arguments are not valid JSON")
+        if not isinstance(arguments, dict):
+            raise ToolArgumentError("arguments must be an object")
+        values = []
+        for name, spec in self.params.items():
+            if name not in arguments or arguments[name] is None:
+                if "default" not in spec:
+                    raise ToolArgumentError(f"missing argument '{name}'")
+                values.append(spec["default"])
+                continue
+            values.append(_coerce(name, arguments[name], spec))
+        return values
+
+    def record(self, seconds=None, error=False, timeout=False):
+        with self._lock:
+            self._counts["calls"] += 1
+            if error:
+                self._counts["errors"] += 1
+            if timeout:
+                self._counts["timeouts"] += 1
+            if seconds is not None:
+                self._latencies.append(seconds)
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._latencies)
+            counts = dict(self._counts)
+        if samples:
+            counts.update(
+                mean_ms=round(1000 * sum(samples) / len(samples), 1),
+                p50_ms=round(1000 * samples[len(samples) // 2], 1),
+                p95_ms=round(1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+            )
+        return counts
+
+
+def _coerce(name, value, spec):
+    kind = spec.get("type", "string")
+    if kind in ("number", "integer") and isinstance(value, str):
+        try:
+            value = float(value.replace(",", "")) if kind == "number" else int(value)
+        except ValueError:
+            raise ToolArgumentError(f"'{name}' must be a {kind}")
+    if kind == "string" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    expected = _TYPES.get(kind)
+    if expected is not None and (not isinstance(value, expected) or (kind != "boolean" and isinstance(value, bool))):
+        raise ToolArgumentError(f"'{name}' must be a {kind}")
+    if kind == "string":
+        value = value.strip()
+        if not value:
+            raise ToolArgumentError(f"'{name}' must not be empty")
+    if "enum" in spec and value not in spec["enum"]:
+        raise ToolArgumentError(f"'{name}' must be one of {', '.join(map(str, spec['enum']))}")
+    return value
+
+
+_tools = {}
+
+
+def tool(name, description, params, timeout=None, concurrency=None, cache=None, keywords=()):
+    """Register the decorated agent; ``cache=(name, ttl)`` wraps it in that result cache"""
+    def decorator(func):
+        if cache is not None:
+            func = cached(*cache)(func)
+        _tools[name] = Tool(
+            name, func, description, params,
+            timeout=DEFAULT_TIMEOUT if timeout is None else timeout,
+            concurrency=concurrency or DEFAULT_CONCURRENCY,
+            cache=cache,
+            keywords=keywords,
+        )
+        return func
+    return decorator
+
+
+def async_impl(name):
+    """Register the decorated coroutine as the asyncio implementation of tool ``name``"""
+    def decorator(func):
+        entry = _tools[name]
+        if entry.cache is not None:
+            # Same named cache as the sync agent, so either pipeline warms it for both
+            func = cached(*entry.cache)(func)
+        entry.async_func = func
+        return func
+    return decorator
+
+
+def get(name):
+    return _tools.get(name)
+
+
+def time_limit(name):
+    """Seconds a call of tool ``name`` may take: its timeout, cut to the turn's remaining budget"""
+    entry = _tools.get(name)
+    limit = entry.timeout if entry else DEFAULT_TIMEOUT
+    left = resilience.remaining()
+    return limit if left is None else max(0.0, min(limit, left))
+
+
+def names():
+    return list(_tools)
+
+
+def schemas(names=None):
+    """Tool list for the chat completion, in registration order"""
+    return [t.schema() for t in _tools.values() if names is None or t.name in names]
+
+
+def select(text):
+    """Schemas of the tools whose keywords appear in ``text``; all of them if none do"""
+    if not SELECTION_ENABLED or not text:
+        return schemas()
+    lowered = text.lower()
+    relevant = [t.name for t in _tools.values() if any(k in lowered for k in t.keywords)]
+    return schemas(relevant) if relevant else schemas()
+
+
+def _error(name, message):
+    return json.dumps({"error": f"{name} failed: {message}"})
+
+
+def _payload_size(arguments):
+    return len(arguments) if isinstance(arguments, str) else len(json.dumps(arguments, default=str))
+
+
+def call(name, arguments):
+    """Validate and run one tool call synchronously; always returns a JSON string"""
+    entry = _tools.get(name)
+    if entry is None:
+        return json.dumps({"error": f"Unknown function {name}"})
+    with tracing.span(f"tool.{name}", request_bytes=_payload_size(arguments)) as span:
+        result = _call(entry, name, arguments)
+        span.set(response_bytes=len(result), error=True if is_error(result) else None)
+    return result
+
+
+def _call(entry, name, arguments):
+    try:
+        values = entry.validate(arguments)
+    except ToolArgumentError as e:
+        entry.record(error=True)
+        return _error(name, str(e))
+    start = time.perf_counter()
+    with entry._semaphore:
+        try:
+            result = entry.func(*values)
+        except Exception as e:
+            entry.record(time.perf_counter() - start, error=True)
+            return _error(name, str(e))
+    entry.record(time.perf_counter() - start, error=is_error(result))
+    return result
+
+
+async def acall(name, arguments):
+    """Asyncio counterpart of ``call`` that also enforces the tool's time limit"""
+    entry = _tools.get(name)
+    if entry is None:
+        return json.dumps({"error": f"Unknown function {name}"})
+    with tracing.span(f"tool.{name}", request_bytes=_payload_size(arguments)) as span:
+        result = await _acall(entry, name, arguments)
+        span.set(response_bytes=len(result), error=True if is_error(result) else None)
+    return result
+
+
+async def _acall(entry, name, arguments):
+    try:
+        values = entry.validate(arguments)
+    except ToolArgumentError as e:
+        entry.record(error=True)
+        return _error(name, str(e))
+    if entry._async_semaphore is None:
+        entry._async_semaphore = asyncio.Semaphore(entry.concurrency)
+    start = time.perf_counter()
+    limit = time_limit(name)
+    async with entry._async_semaphore:
+        try:
+            if entry.async_func is not None:
+                result = await asyncio.wait_for(entry.async_func(*values), timeout=limit)
+            else:
+                result = await asyncio.wait_for(asyncio.to_thread(entry.func, *values), timeout=limit)
+        except asyncio.TimeoutError:
+            print(f"[voice_chat] Tool {name} timed out after {limit:.1f}s")
+            entry.record(time.perf_counter() - start, error=True, timeout=True)
+            return json.dumps({"error": f"{name} timed out"})
+        except Exception as e:
+            entry.record(time.perf_counter() - start, error=True)
+            return _error(name, str(e))
+    entry.record(time.perf_counter() - start, error=is_error(result))
+    return result
+
+
+def timed_out(name):
+    """Count a call whose caller stopped waiting for it"""
+    entry = _tools.get(name)
+    if entry is not None:
+        with entry._lock:
+            entry._counts["timeouts"] += 1
+
+
+def stats():
+    """Call counts and latency percentiles per tool"""
+    return {name: t.stats() for name, t in _tools.items()}
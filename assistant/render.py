@@ -0,0 +1,173 @@
+"""Local natural-language rendering of structured tool results.
+
+Weather, time, currency, calculator, dictionary and news results are already
+fully structured, so the spoken answer is produced from per-tool templates
+instead of a second completion. Free-form results (Wikipedia summaries) and
+turns where the user opts into an LLM rewrite still go to the model;
+``render_all`` returns None in those cases.
+"""
+
+import json
+import os
+import random
+
+TEMPLATES_ENABLED = os.environ.get("ASSISTANT_TEMPLATE_RESPONSES", "1") == "1"
+
+_WEATHER = [
+    "It's {temperature} and {condition} in {city} right now. Humidity is {humidity} and wind is {wind}.",
+    "Right now in {city}: {condition}, {temperature}, feeling like {feels_like}. Wind is {wind}.",
+    "In {city} it's currently {temperature} and {condition}, with {humidity} humidity.",
+]
+
+_TIME = [
+    "It's {time} in {city}, on {day}, {date}.",
+    "The current time in {city} is {time}. It's {day}, {date}.",
+    "In {city} it's {time} on {day}.",
+]
+
+_CURRENCY = [
+    "{original_amount} {from_currency} is about {converted_amount} {to_currency}.",
+    "That comes to roughly {converted_amount} {to_currency}, at a rate of {exchange_rate} per {from_currency}.",
+    "{original_amount} {from_currency} converts to {converted_amount} {to_currency}.",
+]
+
+_CALCULATE = [
+    "{expression} equals {result}.",
+    "The answer is {result}.",
+    "That works out to {result}.",
+]
+
+_NEWS = [
+    "Here are the top headlines from {source}: {headlines}.",
+    "The latest from {source}: {headlines}.",
+]
+
+_DEFINITION = [
+    "{word}, {part_of_speech}: {definition}",
+    "{word} is a {part_of_speech} meaning: {definition}",
+]
+
+_ERROR = [
+    "Sorry, I couldn't get that. {error}.",
+    "Sorry, something went wrong: {error}.",
+]
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:,.4f}".rstrip("0").rstrip(".")
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
+
+
+def _render_definition(data):
+    meanings = data.get("meanings") or []
+    if not meanings:
+        return None
+    first = meanings[0]
+    text = random.choice(_DEFINITION).format(
+        word=data.get("word", "").capitalize(),
+        part_of_speech=first.get("part_of_speech") or "word",
+        definition=first.get("definition", "").rstrip("."),
+    )
+    example = (first.get("example") or "").strip()
+    if example:
+        text += f". For example: {example}"
+    # The example usually brings its own full stop
+    return text if text.endswith((".", "!", "?")) else text + "."
+
+
+def _render_news(data):
+    headlines = data.get("headlines") or []
+    if not headlines:
+        return None
+    return random.choice(_NEWS).format(source=data.get("source", "the news"), headlines="; ".join(headlines))
+
+
+def _render_currency(data):
+    if "conversions" in data:
+        converted = [c for c in data["conversions"] if "error" not in c]
+        parts = [f"{_format_number(c['converted_amount'])} {c['to_currency']}" for c in converted]
+        text = (f"{_format_number(converted[0]['original_amount'])} {converted[0]['from_currency']} is about "
+                + (", ".join(parts[:-1]) + " or " + parts[-1] if len(parts) > 1 else parts[0]) + ".")
+        missing = [c["to_currency"] for c in data["conversions"] if "error" in c]
+        if missing:
+            text += f" I couldn't find a rate for {', '.join(missing)}."
+        return text
+    fields = dict(data)
+    for key in ("original_amount", "converted_amount", "exchange_rate"):
+        fields[key] = _format_number(fields.get(key))
+    return random.choice(_CURRENCY).format(**fields)
+
+
+def _spoken_expression(expression):
+    for symbol, word in (("**", " to the power of "), ("*", " times "), ("/", " divided by "),
+                         ("+", " plus "), ("-", " minus "), ("%", " percent "),
+                         ("sqrt", " the square root of ")):
+        expression = expression.replace(symbol, word)
+    return " ".join(expression.split())
+
+
+def _render_calculate(data):
+    return random.choice(_CALCULATE).format(
+        expression=_spoken_expression(str(data.get("expression", ""))),
+        result=_format_number(data.get("result")),
+    )
+
+
+def _render_weather(data):
+    return random.choice(_WEATHER).format(**dict(data, condition=data["condition"].lower()))
+
+
+def _render_time(data):
+    if "times" not in data:
+        return random.choice(_TIME).format(**data)
+    parts = []
+    for entry in data["times"]:
+        if "error" in entry:
+            parts.append(f"I couldn't find the time zone for {entry['city']}.")
+        else:
+            parts.append(f"In {entry['city']} it's {entry['time']} on {entry['day']}.")
+    return " ".join(parts)
+
+
+_RENDERERS = {
+    "get_weather": _render_weather,
+    "get_world_time": _render_time,
+    "convert_currency": _render_currency,
+    "calculate": _render_calculate,
+    "get_news": _render_news,
+    "get_definition": _render_definition,
+}
+
+
+def render(tool_name, result):
+    """Spoken answer for one tool result, or None when the model should phrase it"""
+    renderer = _RENDERERS.get(tool_name)
+    if renderer is None:
+        return None
+    try:
+        data = json.loads(result)
+        if not isinstance(data, dict):
+            return None
+        if "error" in data:
+            return random.choice(_ERROR).format(error=str(data["error"]).rstrip("."))
+        return renderer(data)
+    except (KeyError, TypeError, ValueError, IndexError):
+        return None
+
+
+def render_all(tool_calls, results, llm_rewrite=False):
+    """Join the rendered answers of every tool call; None if any needs the model"""
+    if llm_rewrite or not TEMPLATES_ENABLED:
+        return None
+    parts = []
+    for tool_call, result in zip(tool_calls, results):
+        text = render(tool_call["name"], result)
+        if text is None:
+            return None
+        parts.append(text)
+    return " ".join(parts) if parts else None
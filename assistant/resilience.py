@@ -0,0 +1,364 @@
+"""Circuit breakers, hedged requests and turn deadlines for upstream calls.
+
+Every call to Groq or an agent API goes through ``call``/``acall`` with the
+name of its endpoint ("groq.chat", "groq.audio" or the API's host name):
+
+* A per-endpoint circuit breaker opens after BREAKER_FAILURES consecutive
+  failures (connection errors, timeouts, HTTP 5xx or 429; a 4xx is the
+  request's fault, not the endpoint's). While open, calls fail at once
+  with ``CircuitOpen`` instead of waiting out a timeout; after
+  BREAKER_RESET seconds one probe is let through and its outcome closes or
+  reopens the breaker.
+* On endpoints with hedging enabled, ``acall`` sends a duplicate request
+  once the first has been outstanding longer than the endpoint's recent
+  HEDGE_PERCENTILE latency, and the first successful answer wins (a fast
+  5xx or 429 does not beat a pending duplicate). Hedges are capped at
+  HEDGE_BUDGET of the endpoint's calls so a slow endpoint does not see its
+  load doubled. Agent GETs hedge by default (ASSISTANT_HEDGE); Groq calls
+  only with ASSISTANT_HEDGE_GROQ=1, since every duplicate is billed. The
+  blocking ``call`` never hedges: its thread could not return before its
+  own request does, so a duplicate would only add load.
+* ``deadline(seconds)`` sets the latency budget of a turn. It is carried in
+  a contextvar (so it follows ``contextvars.copy_context()`` into tool
+  threads), and ``timeout(cap)`` shrinks each request's timeout to what is
+  left of it. Requests are not started once the budget is spent.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+BREAKER_FAILURES = int(os.environ.get("ASSISTANT_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.environ.get("ASSISTANT_BREAKER_RESET", "30"))
+# Hedge agent GETs; Groq calls only on request, since every duplicate is billed
+HEDGE = os.environ.get("ASSISTANT_HEDGE", "1") == "1"
+HEDGE_GROQ = os.environ.get("ASSISTANT_HEDGE_GROQ", "0") == "1"
+HEDGE_PERCENTILE = float(os.environ.get("ASSISTANT_HEDGE_PERCENTILE", "0.95"))
+# Hedge no more than this fraction of an endpoint's calls
+HEDGE_BUDGET = float(os.environ.get("ASSISTANT_HEDGE_BUDGET", "0.1"))
+# Latency samples needed before an endpoint's percentile is trusted
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.02
+# Whole-turn latency budget in seconds (0 disables it)
+TURN_BUDGET = float(os.environ.get("ASSISTANT_TURN_BUDGET", "25"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_deadline = contextvars.ContextVar("assistant_deadline", default=None)
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpen(RuntimeError):
+    """The endpoint's breaker is open; the call was not attempted"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The turn's latency budget is spent"""
+
+
+def _failed(result):
+    # Only server-side trouble counts against an endpoint; a 404 is an answer
+    status = getattr(result, "status_code", None)
+    return isinstance(status, int) and (status >= 500 or status == 429)
+
+
+class Breaker:
+    """Health, latency window and counters of one upstream endpoint"""
+
+    def __init__(self, name, hedge):
+        self.name = name
+        self.hedge = hedge
+        self.state = CLOSED
+        self.failures = 0          # consecutive
+        self.opened_at = 0.0
+        self.probing = False
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=200)
+        self._counts = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0, "hedged": 0, "hedge_wins": 0}
+
+    def allow(self):
+        """Admit a call or raise CircuitOpen"""
+        with self._lock:
+            self._counts["calls"] += 1
+            if self.state == OPEN and time.monotonic() - self.opened_at >= BREAKER_RESET:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return
+            self._counts["rejected"] += 1
+        raise CircuitOpen(f"{self.name} is unavailable (circuit open)")
+
+    def success(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+            if self.state != CLOSED:
+                print(f"[voice_chat] Circuit for {self.name} closed")
+            self.state, self.failures, self.probing = CLOSED, 0, False
+
+    def release(self):
+        """The call ended without a verdict on the endpoint (budget spent, cancelled)"""
+        with self._lock:
+            self.probing = False
+
+    def failure(self):
+        with self._lock:
+            self._counts["failures"] += 1
+            self.failures += 1
+            self.probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= BREAKER_FAILURES):
+                if self.state == CLOSED:
+                    self._counts["opened"] += 1
+                    print(f"[voice_chat] Circuit for {self.name} opened after {self.failures} failures")
+                self.state, self.opened_at = OPEN, time.monotonic()
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None when this call must not be hedged"""
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES or self.state != CLOSED:
+                return None
+            if self._counts["hedged"] >= HEDGE_BUDGET * self._counts["calls"]:
+                return None
+            samples = sorted(self._latencies)
+        delay = max(samples[min(len(samples) - 1, int(HEDGE_PERCENTILE * len(samples)))], HEDGE_MIN_DELAY)
+        left = remaining()
+        return delay if left is None or left > delay else None
+
+    def hedged(self, won=False):
+        with self._lock:
+            self._counts["hedge_wins" if won else "hedged"] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            samples = sorted(self._latencies)
+            counts.update(state=self.state, consecutive_failures=self.failures)
+        if samples:
+            counts["p50_ms"] = round(1000 * samples[len(samples) // 2], 1)
+            counts["p95_ms"] = round(1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1)
+        return counts
+
+
+def breaker(name):
+    """Return the named endpoint's breaker, creating it on first use"""
+    with _breakers_lock:
+        entry = _breakers.get(name)
+        if entry is None:
+            hedge = HEDGE_GROQ if name.startswith("groq.") else HEDGE
+            entry = _breakers[name] = Breaker(name, hedge)
+        return entry
+
+
+@contextlib.contextmanager
+def deadline(seconds=TURN_BUDGET):
+    """Limit everything inside the block to ``seconds`` (an enclosing deadline still applies)"""
+    with within(expires_at(seconds)):
+        yield
+
+
+class SharedDeadline:
+    """Deadline of work done for several callers: the latest of theirs, none once one has none"""
+
+    def __init__(self, at):
+        self.at = at
+        self._lock = threading.Lock()
+
+    def extend(self, at):
+        """Let the work run until ``at`` too (None: without a limit)"""
+        with self._lock:
+            if self.at is not None:
+                self.at = None if at is None else max(self.at, at)
+
+
+def current():
+    """Absolute ``time.monotonic()`` deadline in force, or None"""
+    at = _deadline.get()
+    return at.at if isinstance(at, SharedDeadline) else at
+
+
+@contextlib.contextmanager
+def within(at):
+    """Run the block under the absolute ``time.monotonic()`` deadline ``at`` (None: unchanged)"""
+    now = current()
+    if at is None or (now is not None and now <= at):
+        yield
+        return
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        try:
+            _deadline.reset(token)
+        except ValueError:
+            # Resumed in another context (a generator moved threads)
+            pass
+
+
+@contextlib.contextmanager
+def shared(deadline):
+    """Run the block under a SharedDeadline instead of the caller's own deadline"""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        try:
+            _deadline.reset(token)
+        except ValueError:
+            pass
+
+
+def expires_at(seconds=TURN_BUDGET):
+    """Absolute deadline for a budget starting now, for generators that cannot hold ``deadline`` open"""
+    return time.monotonic() + seconds if seconds else None
+
+
+def remaining():
+    """Seconds left in the current deadline, or None without one"""
+    at = current()
+    return None if at is None else at - time.monotonic()
+
+
+def timeout(cap):
+    """``cap`` shrunk to the time left; raises DeadlineExceeded once it is spent"""
+    left = remaining()
+    if left is None:
+        return cap
+    if left <= 0:
+        raise DeadlineExceeded("turn latency budget exceeded")
+    return min(cap, left) if cap is not None else left
+
+
+def expired():
+    """True once the current deadline has passed"""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def _endpoint_fault(error):
+    """True for errors that say the endpoint is unhealthy: connection trouble, timeouts, 5xx and 429.
+
+    A 4xx such as Groq's ``tool_use_failed`` 400 is an answer about the
+    request, so it never counts towards opening the breaker.
+    """
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status == 429
+    if isinstance(error, (OSError, TimeoutError)):
+        return True
+    # Client libraries are only inspected once they are loaded (they raised the error)
+    httpx, groq = sys.modules.get("httpx"), sys.modules.get("groq")
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    return groq is not None and isinstance(error, groq.APIConnectionError)
+
+
+def _settle(entry, error):
+    """Record a failed attempt; a timeout caused by the spent budget is not the endpoint's fault"""
+    if isinstance(error, DeadlineExceeded) or expired():
+        entry.release()
+        if not isinstance(error, DeadlineExceeded):
+            raise DeadlineExceeded("turn latency budget exceeded") from error
+        return
+    if _endpoint_fault(error):
+        entry.failure()
+    else:
+        entry.release()
+
+
+def _attempt(entry, func, args, kwargs):
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        _settle(entry, e)
+        raise
+    if _failed(result):
+        entry.failure()
+    else:
+        entry.success(time.perf_counter() - started)
+    return result
+
+
+def _first_success(entry, hedge, done, pending):
+    """The finished attempt to return: a success, or a failure once nothing is pending"""
+    for future in done:
+        if future.exception() is None and not _failed(future.result()):
+            if future is hedge:
+                entry.hedged(won=True)
+            return future
+    return None if pending else next(iter(done))
+
+
+def call(name, func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)`` against endpoint ``name`` with its breaker.
+
+    Calls are never hedged here: a thread cannot abandon its own request, so
+    a duplicate would add load to a slow endpoint without shortening the
+    wait. Hedging is done by ``acall``.
+    """
+    timeout(None)
+    entry = breaker(name)
+    entry.allow()
+    return _attempt(entry, func, args, kwargs)
+
+
+async def _aattempt(entry, func, args, kwargs):
+    started = time.perf_counter()
+    try:
+        result = await func(*args, **kwargs)
+    except asyncio.CancelledError:
+        entry.release()
+        raise
+    except Exception as e:
+        _settle(entry, e)
+        raise
+    if _failed(result):
+        entry.failure()
+    else:
+        entry.success(time.perf_counter() - started)
+    return result
+
+
+async def acall(name, func, *args, **kwargs):
+    """Asyncio counterpart of ``call`` for an ``async def func``; the losing hedge is cancelled"""
+    timeout(None)
+    entry = breaker(name)
+    entry.allow()
+    delay = entry.hedge_delay()
+    if delay is None:
+        return await _aattempt(entry, func, args, kwargs)
+    first = asyncio.ensure_future(_aattempt(entry, func, args, kwargs))
+    done, _ = await asyncio.wait([first], timeout=delay)
+    if done:
+        return first.result()
+    entry.hedged()
+    second = asyncio.ensure_future(_aattempt(entry, func, args, kwargs))
+    pending = {first, second}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("turn latency budget exceeded")
+            winner = _first_success(entry, second, done, pending)
+            if winner is not None:
+                return winner.result()
+    finally:
+        for task in pending:
+            task.cancel()
+    return first.result()
+
+
+def stats():
+    """Breaker state, hedging counters and latency per endpoint"""
+    with _breakers_lock:
+        entries = list(_breakers.values())
+    return {entry.name: entry.stats() for entry in entries}
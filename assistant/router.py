@@ -0,0 +1,258 @@
+"""Local intent router that can skip the tool-selection completion.
+
+Obvious utterances ("what's 15 times 20", "time in Tokyo", "define
+serendipity") are matched with patterns that extract the tool name and its
+arguments together with a confidence score. When the confidence clears
+ROUTER_THRESHOLD the pipeline dispatches the tool directly; anything else
+falls back to model-driven tool selection. An optional classifier can be
+plugged in with ``set_classifier`` for utterances no rule matches.
+
+Measure precision offline with ``python -m assistant.router_eval``.
+"""
+
+import os
+import re
+import threading
+from collections import namedtuple
+
+from assistant import timezones
+
+ROUTER_THRESHOLD = float(os.environ.get("ASSISTANT_ROUTER_THRESHOLD", "0.85"))
+ROUTER_ENABLED = os.environ.get("ASSISTANT_ROUTER", "1") == "1"
+
+Route = namedtuple("Route", ["tool", "arguments", "confidence"])
+
+_OPERATOR_WORDS = [
+    (r"\bmultiplied by\b", "*"),
+    (r"\btimes\b", "*"),
+    (r"\bx\b", "*"),
+    (r"\bdivided by\b", "/"),
+    (r"\bover\b", "/"),
+    (r"\bplus\b", "+"),
+    (r"\bminus\b", "-"),
+    (r"\bto the power of\b", "**"),
+    (r"\bsquared\b", "**2"),
+    (r"\bpercent of\b", "% of"),
+]
+
+_CURRENCY_NAMES = {
+    "dollar": "USD", "dollars": "USD", "usd": "USD", "us dollars": "USD", "bucks": "USD",
+    "euro": "EUR", "euros": "EUR", "eur": "EUR",
+    "pound": "GBP", "pounds": "GBP", "gbp": "GBP", "sterling": "GBP",
+    "rupee": "INR", "rupees": "INR", "inr": "INR",
+    "yen": "JPY", "jpy": "JPY",
+    "yuan": "CNY", "cny": "CNY", "renminbi": "CNY",
+    "franc": "CHF", "francs": "CHF", "chf": "CHF",
+    "canadian dollar": "CAD", "canadian dollars": "CAD", "cad": "CAD",
+    "australian dollar": "AUD", "australian dollars": "AUD", "aud": "AUD",
+    "dirham": "AED", "dirhams": "AED", "aed": "AED",
+    "peso": "MXN", "pesos": "MXN", "mxn": "MXN",
+    "won": "KRW", "krw": "KRW",
+    "ruble": "RUB", "rubles": "RUB", "rub": "RUB",
+}
+
+_CURRENCY = "|".join(sorted((re.escape(k) for k in _CURRENCY_NAMES), key=len, reverse=True))
+_PLACE = r"(?P<city>[a-z][a-z .'\-]{1,40}?)"
+_PLACES = r"(?P<city>[a-z\u00e0-\u017f][a-z\u00e0-\u017f .,&'\-]{1,80}?)"
+
+
+# Words that point at the conversation or the speaker rather than name something
+_DEICTIC = {"it", "this", "that", "these", "those", "they", "them", "here", "there", "home", "me", "you"}
+# Forecasts and times of day are for the model, not the current-conditions tools
+_TEMPORAL = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|morning|afternoon|evening|night|weekend|week|next|later|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
+    re.IGNORECASE,
+)
+
+
+def _place(match):
+    city = match.group("city").strip()
+    # Compound requests ("weather in Tokyo and time in Paris") go to the model
+    if re.search(r"\b(and|or|then|also)\b", city, re.IGNORECASE):
+        return None
+    if _TEMPORAL.search(city) or city.lower() in _DEICTIC or re.match(r"(my|our|your)\b", city, re.IGNORECASE):
+        return None
+    return city
+
+
+def _known_place(city):
+    return timezones.lookup(city) is not None
+
+
+def _normalize(text):
+    # Case is kept so arguments come out as spoken ("London", "Albert Einstein");
+    # the rules match case-insensitively
+    text = text.replace("’", "'").strip()
+    text = re.sub(r"[?!.,]+$", "", text)
+    text = re.sub(r"^(hey|hi|ok|okay|please|so)[, ]+", "", text, flags=re.IGNORECASE)
+    text = re.sub(r"\s+(please|right now|now|today)$", "", text, flags=re.IGNORECASE)
+    return " ".join(text.split())
+
+
+def _match(pattern, text):
+    return re.fullmatch(pattern, text, re.IGNORECASE)
+
+
+def _math_expression(phrase):
+    phrase = phrase.lower()
+    expr = re.sub(r"\bsquare root of (\d+(?:\.\d+)?)", r"sqrt(\1)", phrase)
+    for pattern, symbol in _OPERATOR_WORDS:
+        expr = re.sub(pattern, f" {symbol} ", expr)
+    expr = " ".join(expr.split())
+    # Only accept phrases that became pure arithmetic
+    if not re.fullmatch(r"(?:[\d\s.+\-*/()%]|\bof\b|\bsqrt\b)+", expr):
+        return None
+    if not re.search(r"\d", expr) or not re.search(r"[+\-*/%]|sqrt", expr):
+        return None
+    return expr
+
+
+def _rule_calculate(text):
+    m = _match(r"(?:what(?:'s| is)(?: the)?|calculate|compute|how much is|what does)\s+(?P<expr>.+?)(?:\s+equal)?", text)
+    phrase = m.group("expr") if m else text
+    expr = _math_expression(phrase)
+    if expr is None:
+        return None
+    return Route("calculate", {"expression": expr}, 0.95 if m else 0.9)
+
+
+def _rule_time(text):
+    m = _match(
+        r"(?:what(?:'s| is) the |what |the |current )?(?:local |current )?time(?: is it)?(?: right now)? in " + _PLACES,
+        text,
+    )
+    if not m:
+        return None
+    city = m.group("city").strip()
+    if "," not in city and "&" not in city:
+        # A single place is only dispatched when the time zone index knows it
+        if _place(m) and _known_place(city):
+            return Route("get_world_time", {"city": city}, 0.95)
+        return None
+    # "time in Tokyo, Paris and New York" is one bulk lookup, but only when
+    # every part is a known place ("time in Tokyo and weather in Paris" is not)
+    found = timezones.lookup_many(city)
+    if found and all(place for _, place in found):
+        return Route("get_world_time", {"city": city}, 0.9)
+    return None
+
+
+def _rule_weather(text):
+    m = _match(
+        r"(?:what(?:'s| is) |how(?:'s| is) )?(?:the )?(?:weather|temperature|forecast)(?: like)?(?: right now| today)? (?:in|for|at) " + _PLACE,
+        text,
+    )
+    if m and _place(m):
+        # Places the index does not know still reach the tool, through the model
+        return Route("get_weather", {"city": _place(m)}, 0.95 if _known_place(_place(m)) else 0.8)
+    m = _match(r"is it (?:raining|sunny|cold|hot|snowing) in " + _PLACE, text)
+    if m and _place(m):
+        return Route("get_weather", {"city": _place(m)}, 0.9 if _known_place(_place(m)) else 0.8)
+    return None
+
+
+def _rule_definition(text):
+    patterns = [
+        r"define (?:the word )?(?P<word>[a-z\-']+)",
+        r"what does (?:the word )?(?P<word>[a-z\-']+) mean",
+        r"(?:what is |what's )?(?:the )?(?:meaning|definition) of (?:the word )?(?P<word>[a-z\-']+)",
+    ]
+    for pattern in patterns:
+        m = _match(pattern, text)
+        # "what does it mean" refers back to the conversation, which only the model sees
+        if m and m.group("word").lower() not in _DEICTIC:
+            return Route("get_definition", {"word": m.group("word").lower()}, 0.95)
+    return None
+
+
+def _rule_currency(text):
+    m = _match(
+        r"(?:convert |how much is |what(?:'s| is) )?(?P<amount>\d+(?:\.\d+)?)\s*(?P<src>" + _CURRENCY + r")"
+        r" (?:to|in|into) (?P<dst>(?:" + _CURRENCY + r")(?:(?:,? and |, |,)(?:" + _CURRENCY + r"))*)",
+        text,
+    )
+    if not m:
+        return None
+    # "100 dollars to euros, pounds and yen" converts to every target in one call
+    targets = [_CURRENCY_NAMES[name] for name in re.split(r",? and |, ?", m.group("dst").lower())]
+    return Route(
+        "convert_currency",
+        {
+            "amount": float(m.group("amount")),
+            "from_currency": _CURRENCY_NAMES[m.group("src").lower()],
+            "to_currency": ", ".join(dict.fromkeys(targets)),
+        },
+        0.95,
+    )
+
+
+def _rule_news(text):
+    if _match(
+        r"(?:what(?:'s| is) (?:in )?the |tell me the |give me the |read me the |show me the |get )?"
+        r"(?:latest |top |today's )?(?:news|headlines|news headlines)(?: today)?",
+        text,
+    ):
+        return Route("get_news", {"category": "general"}, 0.95)
+    return None
+
+
+def _rule_wikipedia(text):
+    m = _match(r"(?:who (?:is|was)|tell me about|tell me something about) (?P<query>.+)", text)
+    if m:
+        # Often answerable without a tool, so leave the decision to the model by default
+        return Route("search_wikipedia", {"query": m.group("query")}, 0.7)
+    return None
+
+
+_RULES = [
+    _rule_time,
+    _rule_weather,
+    _rule_currency,
+    _rule_definition,
+    _rule_news,
+    _rule_calculate,
+    _rule_wikipedia,
+]
+
+_classifier = None
+_stats_lock = threading.Lock()
+_stats = {"total": 0, "routed": 0, "fallback": 0}
+
+
+def set_classifier(classifier):
+    """Register ``classifier(text) -> Route | None`` for utterances no rule matches"""
+    global _classifier
+    _classifier = classifier
+
+
+def classify(text):
+    """Best Route for ``text`` regardless of threshold, or None"""
+    normalized = _normalize(text)
+    best = None
+    for rule in _RULES:
+        route = rule(normalized)
+        if route is not None and (best is None or route.confidence > best.confidence):
+            best = route
+    if best is None and _classifier is not None:
+        best = _classifier(normalized)
+    return best
+
+
+def route(text, threshold=None):
+    """Return a Route to dispatch directly, or None to fall back to the model"""
+    if not ROUTER_ENABLED:
+        return None
+    threshold = ROUTER_THRESHOLD if threshold is None else threshold
+    best = classify(text)
+    routed = best is not None and best.confidence >= threshold
+    with _stats_lock:
+        _stats["total"] += 1
+        _stats["routed" if routed else "fallback"] += 1
+    return best if routed else None
+
+
+def stats():
+    with _stats_lock:
+        total = _stats["total"]
+        return dict(_stats, hit_rate=round(_stats["routed"] / total, 3) if total else 0.0)
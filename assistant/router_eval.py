@@ -0,0 +1,117 @@
+"""Offline evaluation set for the local intent router.
+
+Each case is (utterance, expected tool or None, expected arguments). A None
+tool means the router must fall back to the model. Run with
+
+    python -m assistant.router_eval
+
+to print precision (routed turns that picked the right tool and arguments),
+coverage (share of tool-worthy turns routed locally) and every miss.
+"""
+
+import json
+import sys
+
+from assistant import router
+
+EVAL_SET = [
+    # calculate
+    ("What's 15 times 20?", "calculate", {"expression": "15 * 20"}),
+    ("What is 100 divided by 4", "calculate", {"expression": "100 / 4"}),
+    ("Calculate 12 plus 30.", "calculate", {"expression": "12 + 30"}),
+    ("what is 7 minus 9", "calculate", {"expression": "7 - 9"}),
+    ("How much is 3 multiplied by 14?", "calculate", {"expression": "3 * 14"}),
+    ("What's 2 to the power of 10?", "calculate", {"expression": "2 ** 10"}),
+    ("(50 + 30) * 2", "calculate", {"expression": "(50 + 30) * 2"}),
+    ("What's 15% of 80?", "calculate", {"expression": "15% of 80"}),
+    ("What is 20 percent of 150", "calculate", {"expression": "20 % of 150"}),
+    ("What's the square root of 144?", "calculate", {"expression": "sqrt(144)"}),
+    # get_world_time
+    ("What time is it in Tokyo?", "get_world_time", {"city": "Tokyo"}),
+    ("Time in London", "get_world_time", {"city": "London"}),
+    ("What's the time in New York right now?", "get_world_time", {"city": "New York"}),
+    ("current time in Sydney", "get_world_time", {"city": "Sydney"}),
+    ("What's the local time in Sao Paulo?", "get_world_time", {"city": "Sao Paulo"}),
+    ("What time is it in Bengaluru?", "get_world_time", {"city": "Bengaluru"}),
+    ("Time in Tokyo, Paris and New York", "get_world_time", {"city": "Tokyo, Paris and New York"}),
+    ("What's the time in Paris, France?", "get_world_time", {"city": "Paris, France"}),
+    # get_weather
+    ("What's the weather in London?", "get_weather", {"city": "London"}),
+    ("How's the weather like in Paris today?", "get_weather", {"city": "Paris"}),
+    ("weather for Berlin", "get_weather", {"city": "Berlin"}),
+    ("Is it raining in Seattle?", "get_weather", {"city": "Seattle"}),
+    ("What is the temperature in Dubai?", "get_weather", {"city": "Dubai"}),
+    # get_definition
+    ("Define serendipity.", "get_definition", {"word": "serendipity"}),
+    ("What does ephemeral mean?", "get_definition", {"word": "ephemeral"}),
+    ("What is the meaning of ubiquitous?", "get_definition", {"word": "ubiquitous"}),
+    ("definition of the word laconic", "get_definition", {"word": "laconic"}),
+    # convert_currency
+    ("Convert 100 dollars to euros", "convert_currency",
+     {"amount": 100.0, "from_currency": "USD", "to_currency": "EUR"}),
+    ("How much is 50 pounds in rupees?", "convert_currency",
+     {"amount": 50.0, "from_currency": "GBP", "to_currency": "INR"}),
+    ("250 usd to jpy", "convert_currency",
+     {"amount": 250.0, "from_currency": "USD", "to_currency": "JPY"}),
+    ("Convert 100 dollars to euros, pounds and yen", "convert_currency",
+     {"amount": 100.0, "from_currency": "USD", "to_currency": "EUR, GBP, JPY"}),
+    # get_news
+    ("What's the latest news?", "get_news", {"category": "general"}),
+    ("Tell me the top headlines", "get_news", {"category": "general"}),
+    ("news", "get_news", {"category": "general"}),
+    # must fall back to the model
+    ("Weather in Tokyo and time in Tokyo", None, None),
+    ("Time in Tokyo and weather in Paris", None, None),
+    ("Who is Albert Einstein?", None, None),
+    ("Tell me about quantum computing", None, None),
+    ("Hello, how are you?", None, None),
+    ("Can you tell me a joke?", None, None),
+    ("What should I cook for dinner?", None, None),
+    ("What is love?", None, None),
+    ("Thanks, that's all", None, None),
+    ("Is it a good time to buy a house?", None, None),
+    ("What time is it in my head?", None, None),
+    ("time in the morning", None, None),
+    ("Is it hot in here?", None, None),
+    ("What's the weather in London tomorrow?", None, None),
+    ("What does it mean?", None, None),
+    ("What does that mean?", None, None),
+]
+
+
+def evaluate(cases=EVAL_SET, threshold=None):
+    routed = correct = tool_cases = routed_tool_cases = 0
+    misses = []
+    for utterance, tool, arguments in cases:
+        result = router.classify(utterance)
+        limit = router.ROUTER_THRESHOLD if threshold is None else threshold
+        if result is not None and result.confidence < limit:
+            result = None
+        if tool is not None:
+            tool_cases += 1
+        if result is None:
+            if tool is not None:
+                misses.append((utterance, tool, None))
+            continue
+        routed += 1
+        if tool is not None:
+            routed_tool_cases += 1
+        if result.tool == tool and result.arguments == arguments:
+            correct += 1
+        else:
+            misses.append((utterance, tool, (result.tool, result.arguments)))
+    return {
+        "cases": len(cases),
+        "routed": routed,
+        "precision": round(correct / routed, 3) if routed else 0.0,
+        "coverage": round(routed_tool_cases / tool_cases, 3) if tool_cases else 0.0,
+        "misses": misses,
+    }
+
+
+if __name__ == "__main__":
+    report = evaluate()
+    for utterance, expected, got in report.pop("misses"):
+        print(f"MISS {utterance!r}: expected {expected}, got {got}")
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["precision"] >= 0.95 else 1)
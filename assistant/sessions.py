@@ -0,0 +1,148 @@
+"""Per-session conversation state with bounded memory and prompt size.
+
+The Gradio ``gr.State`` holds only a session id; the messages live here.
+Each session keeps at most ``max_messages`` entries, the prompt sent to the
+model is trimmed to ``token_budget`` estimated tokens (older turns are folded
+into a one-line summary), idle sessions expire after ``idle_timeout`` seconds
+and the store never holds more than ``max_sessions`` sessions.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+TOKEN_BUDGET = int(os.environ.get("ASSISTANT_HISTORY_TOKENS", "1500"))
+MAX_MESSAGES = int(os.environ.get("ASSISTANT_SESSION_MESSAGES", "60"))
+MAX_SESSIONS = int(os.environ.get("ASSISTANT_MAX_SESSIONS", "5000"))
+IDLE_TIMEOUT = float(os.environ.get("ASSISTANT_SESSION_IDLE_SECONDS", "1800"))
+
+# Number of dropped user questions quoted in the summary of trimmed turns
+_SUMMARY_TOPICS = 5
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return len(text or "") // 4 + 4
+
+
+class Session:
+    def __init__(self, session_id, max_messages=MAX_MESSAGES):
+        self.id = session_id
+        self.messages = []
+        self.max_messages = max_messages
+        self.last_seen = time.time()
+        # Held while a turn runs; a plain Lock because Gradio may resume the
+        # turn's generator on another thread
+        self._turn = threading.Lock()
+
+    def begin_turn(self):
+        """Claim the session for one turn; False if a turn is already running"""
+        return self._turn.acquire(blocking=False)
+
+    def end_turn(self):
+        self._turn.release()
+
+    def append(self, message):
+        self.messages.append(message)
+        if len(self.messages) > self.max_messages:
+            del self.messages[:len(self.messages) - self.max_messages]
+
+    def clear(self):
+        self.messages = []
+
+
+class SessionStore:
+    def __init__(self, token_budget=TOKEN_BUDGET, max_messages=MAX_MESSAGES,
+                 max_sessions=MAX_SESSIONS, idle_timeout=IDLE_TIMEOUT):
+        self.token_budget = token_budget
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self.evicted = 0
+
+    def get(self, session_id=None):
+        """Return the session for ``session_id``, creating a fresh one if unknown"""
+        now = time.time()
+        with self._lock:
+            self._sweep(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = Session(session_id or uuid.uuid4().hex, self.max_messages)
+                self._sessions[session.id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+            self._sessions.move_to_end(session.id)
+            session.last_seen = now
+            return session
+
+    def drop(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _sweep(self, now):
+        # Amortized idle eviction: at most one pass per minute
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        cutoff = now - self.idle_timeout
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_seen >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def prompt_history(self, session):
+        """User/assistant turns for the model, newest first until the token budget is spent"""
+        valid = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in session.messages
+            if msg.get("role") in ("user", "assistant") and msg.get("content")
+        ]
+        kept = []
+        used = 0
+        for msg in reversed(valid):
+            cost = estimate_tokens(msg["content"])
+            # Always keep the latest message even if it alone exceeds the budget
+            if kept and used + cost > self.token_budget:
+                break
+            kept.append(msg)
+            used += cost
+        kept.reverse()
+
+        # Never start the window with a dangling assistant reply
+        while len(kept) > 1 and kept[0]["role"] == "assistant":
+            kept.pop(0)
+
+        dropped = valid[:len(valid) - len(kept)]
+        summary = _summarize(dropped)
+        if summary:
+            return [{"role": "system", "content": summary}, *kept]
+        return kept
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "evicted": self.evicted,
+                "messages": sum(len(s.messages) for s in self._sessions.values()),
+            }
+
+
+def _summarize(dropped):
+    topics = [msg["content"][:80] for msg in dropped if msg["role"] == "user"]
+    if not topics:
+        return None
+    recent = "; ".join(topics[-_SUMMARY_TOPICS:])
+    return f"Earlier in this conversation the user asked about: {recent}"
+
+
+# Process-wide store used by the voice chat pipelines
+store = SessionStore()
@@ -0,0 +1,144 @@
+"""In-flight request coalescing ("singleflight") for agent lookups.
+
+Concurrent calls with the same key share one execution: the first caller
+runs the fetch, later callers wait for it and receive the same result (or
+exception). Each in-flight call is a ``concurrent.futures.Future``, so
+thread-based and asyncio callers coalesce with each other. Nothing is kept
+once the call finishes; caching is ``assistant.cache``'s job, and ``cached``
+routes every cache miss through the group of the same name.
+
+A blocking leader runs the fetch under its own turn deadline. An asyncio
+fetch runs as a task of its own under a ``resilience.SharedDeadline``: the
+latest deadline of everyone waiting for it.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from assistant import resilience
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class Group:
+    """Coalesces concurrent calls per key"""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> (Future, loop of an asyncio leader or None, SharedDeadline or None)
+        self._tasks = set()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def _join(self, key, loop, blocking):
+        """Return (future, is_leader, SharedDeadline of an asyncio leader or None)"""
+        with self._lock:
+            self.calls += 1
+            existing = self._calls.get(key)
+            # A blocking waiter on the loop thread would deadlock an asyncio leader on that loop
+            if existing is not None and not (blocking and existing[1] is not None and existing[1] is _running_loop()):
+                self.coalesced += 1
+                if existing[2] is not None:
+                    existing[2].extend(resilience.current())
+                return existing[0], False, existing[2]
+            future = Future()
+            self.executions += 1
+            deadline = None if blocking else resilience.SharedDeadline(resilience.current())
+            if existing is None:
+                self._calls[key] = (future, loop, deadline)
+            return future, True, deadline
+
+    def _done(self, key, future):
+        with self._lock:
+            current = self._calls.get(key)
+            if current is not None and current[0] is future:
+                del self._calls[key]
+
+    def do(self, key, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` once for all concurrent callers of ``key``"""
+        future, leader, _ = self._join(key, None, True)
+        if not leader:
+            try:
+                return future.result(timeout=resilience.remaining())
+            except TimeoutError:
+                raise resilience.DeadlineExceeded("turn latency budget exceeded") from None
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._done(key, future)
+
+    async def ado(self, key, func, *args, **kwargs):
+        """Asyncio counterpart of ``do``; ``func`` returns an awaitable.
+
+        The shared fetch runs as its own task under the latest deadline of
+        its waiters, and every caller (the one that started it included)
+        waits through ``asyncio.shield``: a caller that is cancelled or times
+        out stops waiting without cancelling the fetch the others depend on.
+        """
+        future, leader, deadline = self._join(key, _running_loop(), False)
+        if leader:
+            task = asyncio.ensure_future(self._run(key, future, deadline, func, args, kwargs))
+            # The loop only keeps weak references to tasks
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    async def _run(self, key, future, deadline, func, args, kwargs):
+        try:
+            with resilience.shared(deadline):
+                result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # Only happens when the loop shuts down; waiters get an error, not a cancellation
+            future.set_exception(RuntimeError(f"{self.name} fetch was cancelled"))
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            self._done(key, future)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+def group(name):
+    """Return the named group, creating it on first use"""
+    with _groups_lock:
+        existing = _groups.get(name)
+        if existing is None:
+            existing = _groups[name] = Group(name)
+        return existing
+
+
+def stats():
+    """Counters for every group, keyed by name"""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {g.name: g.stats() for g in groups}
@@ -0,0 +1,247 @@
+"""Offline city → IANA timezone index for the world time agent.
+
+The index is built once, on first use, from the city list shipped in
+``assistant/data/cities.tsv`` (major cities with their common aliases, most
+populous first), the city part of every pytz zone name, and the pytz country
+tables. Keys are accent- and punctuation-insensitive, so "São Paulo", "sao
+paulo" and "Sao-Paulo" hit the same dict entry in O(1); misspellings fall
+back to a cached fuzzy match. "Paris, France" style suffixes pick the
+candidate in that country, and ``lookup_many`` resolves "X, Y and Z".
+"""
+
+import difflib
+import os
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+import pytz
+
+CITIES_FILE = os.path.join(os.path.dirname(__file__), "data", "cities.tsv")
+FUZZY_CUTOFF = float(os.environ.get("ASSISTANT_TZ_FUZZY_CUTOFF", "0.8"))
+# Keys this short may only be one typo away from their match ("tokio" is
+# Tokyo, but "tobago" is not Togo)
+FUZZY_SHORT_KEY = 6
+
+Place = namedtuple("Place", ["name", "country", "timezone"])
+
+# Spoken country names pytz spells differently ("Britain (UK)", "Korea (South)")
+_COUNTRY_ALIASES = {
+    "usa": "US", "us": "US", "america": "US", "united states of america": "US",
+    "uk": "GB", "united kingdom": "GB", "britain": "GB", "great britain": "GB",
+    "england": "GB", "scotland": "GB", "wales": "GB", "northern ireland": "GB",
+    "uae": "AE", "emirates": "AE",
+    "south korea": "KR", "korea": "KR", "north korea": "KP",
+    "russia": "RU", "vietnam": "VN", "iran": "IR", "syria": "SY", "laos": "LA",
+    "taiwan": "TW", "bolivia": "BO", "venezuela": "VE", "tanzania": "TZ",
+    "moldova": "MD", "czechia": "CZ", "czech republic": "CZ", "holland": "NL",
+    "ivory coast": "CI", "congo": "CD", "burma": "MM", "macao": "MO",
+}
+
+# Zone names that are not places
+_SKIP_REGIONS = ("Etc", "US", "Canada", "SystemV")
+
+_SPLIT = re.compile(r"(\s*(?:,|;|&|\band\b|\bplus\b)\s*)")
+
+_lock = threading.Lock()
+_index = None  # normalized name -> tuple of Places, best candidate first
+_countries = None  # normalized country name -> country code
+_primary = None  # country code -> representative timezone
+
+
+def normalize(name):
+    """Fold accents, case and punctuation: "São Paulo" and "sao-paulo" give the same key"""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("'", "").replace("’", "").replace("&", " and ")
+    text = re.sub(r"[^a-z0-9]+", " ", text).strip()
+    text = re.sub(r"^the ", "", text)
+    return re.sub(r"\bst\b", "saint", text)
+
+
+def _add(index, key, place):
+    if not key:
+        return
+    candidates = index.setdefault(key, [])
+    if all(c.timezone != place.timezone or c.country != place.country for c in candidates):
+        candidates.append(place)
+
+
+def _read_cities():
+    with open(CITIES_FILE, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            aliases = fields[3].split("|") if len(fields) > 3 and fields[3] else []
+            yield fields[0], fields[1], fields[2], aliases
+
+
+def _build():
+    index, countries, primary = {}, {}, {}
+    zone_country = {}
+    for code, zones in pytz.country_timezones.items():
+        for zone in zones:
+            zone_country.setdefault(zone, code.upper())
+
+    for name, country, zone, aliases in _read_cities():
+        place = Place(name, country, zone)
+        primary.setdefault(country, zone)
+        for key in [name] + aliases:
+            _add(index, normalize(key), place)
+
+    for zone in pytz.common_timezones:
+        parts = zone.split("/")
+        if len(parts) < 2 or parts[0] in _SKIP_REGIONS:
+            continue
+        city = parts[-1].replace("_", " ")
+        _add(index, normalize(city), Place(city, zone_country.get(zone, ""), zone))
+
+    for code, name in pytz.country_names.items():
+        code = code.upper()
+        zones = pytz.country_timezones.get(code.lower())
+        if not zones:
+            continue
+        primary.setdefault(code, zones[0])
+        # "Korea (South)" is indexed both as-is and as plain "korea"
+        for key in {normalize(name), normalize(re.sub(r"\s*\(.*\)", "", name))}:
+            countries.setdefault(key, code)
+    for alias, code in _COUNTRY_ALIASES.items():
+        countries[alias] = code
+    for key, code in countries.items():
+        name = re.sub(r"\s*\(.*\)", "", pytz.country_names[code.lower()])
+        _add(index, key, Place(name, code, primary[code]))
+
+    for name in ("UTC", "GMT"):
+        _add(index, normalize(name), Place(name, "", "UTC"))
+
+    return {k: tuple(v) for k, v in index.items()}, countries, primary
+
+
+def _load():
+    global _index, _countries, _primary
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index, _countries, _primary = _build()
+    return _index
+
+
+def country_code(name):
+    """ISO code for a country name or alias ("Japan", "UK"), or None"""
+    _load()
+    key = normalize(name)
+    if key.upper() in _primary and len(key) == 2:
+        return key.upper()
+    return _countries.get(key)
+
+
+def _one_edit(a, b):
+    """True when ``b`` is ``a`` with at most one character inserted, deleted or replaced"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i + (len(a) == len(b)):] == b[i + 1:]
+
+
+@lru_cache(maxsize=1024)
+def _fuzzy_key(key):
+    matches = difflib.get_close_matches(key, _load().keys(), n=5, cutoff=FUZZY_CUTOFF)
+    if len(key) <= FUZZY_SHORT_KEY:
+        matches = [m for m in matches if _one_edit(key, m)]
+    return matches[0] if matches else None
+
+
+def _candidates(name):
+    index = _load()
+    key = normalize(name)
+    if not key:
+        return ()
+    if key in index:
+        return index[key]
+    fuzzy = _fuzzy_key(key)
+    return index[fuzzy] if fuzzy else ()
+
+
+def lookup(query, country=None):
+    """Best Place for a city, alias or country name, or None.
+
+    ``country`` (a name or ISO code) picks among same-named cities; it can
+    also be given inline as "Paris, France". An unknown city in a
+    single-timezone country still resolves to that country's zone, while a
+    qualifier that is not a country ("Paris, Texas") finds nothing rather
+    than a same-named city elsewhere.
+    """
+    name = query
+    if country is None and "," in query and not _known(query):
+        name, country = query.rsplit(",", 1)
+    candidates = _candidates(name)
+    if country is None:
+        return candidates[0] if candidates else None
+
+    code = country_code(country)
+    if code is None:
+        return None
+    for place in candidates:
+        if place.country == code:
+            return place
+    zones = pytz.country_timezones.get(code.lower(), [])
+    if len(zones) == 1:
+        return Place(name.strip().title(), code, zones[0])
+    return None
+
+
+def _known(name):
+    """True when ``name`` is exactly a key of the index (no fuzzy matching)"""
+    return normalize(name) in _load()
+
+
+def _qualifier(part):
+    """True when a part after a comma qualifies the previous name: a country, or no place at all"""
+    return country_code(part) is not None or lookup(part) is None
+
+
+def split_places(text):
+    """Split "Tokyo, Paris and New York" into places, keeping "Paris, France",
+    "Portland, Maine" and names such as "Bosnia and Herzegovina" together"""
+    tokens = _SPLIT.split(text.strip())
+
+    def span(i, j):
+        # parts i..j-1 with the separators between them, as typed
+        return "".join(tokens[2 * i:2 * j - 1])
+
+    count = (len(tokens) + 1) // 2
+    places = []
+    i = 0
+    while i < count:
+        # Longest run of parts that is itself a known name ("Trinidad and Tobago")
+        end = next(
+            (j for j in range(count, i + 1, -1) if tokens[2 * i] and tokens[2 * j - 2] and _known(span(i, j))),
+            i + 1,
+        )
+        separator = tokens[2 * i - 1].strip() if i else ""
+        part, i = span(i, end), end
+        if not part:
+            continue
+        # The qualifier stays with its name and is checked by lookup(name, country)
+        if places and separator == "," and _qualifier(part):
+            places[-1] = f"{places[-1]}, {part}"
+        else:
+            places.append(part)
+    return places
+
+
+def lookup_many(text):
+    """(query, Place or None) for every place named in ``text``"""
+    return [(name, lookup(name)) for name in split_places(text)]
+
+
+def stats():
+    index = _load()
+    return {"keys": len(index), "places": sum(len(v) for v in index.values())}
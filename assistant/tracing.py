@@ -0,0 +1,244 @@
+"""Per-stage latency tracing for voice turns.
+
+Every turn is a root ``turn`` span with child spans for transcription, the
+first completion, each tool call (``tool.<name>``), the final completion and
+TTS. Spans carry token counts and payload sizes as attributes. Finished
+spans are
+
+* appended to a size-rotated JSONL file (ASSISTANT_TRACE_FILE, empty to
+  disable) using OTLP field names (traceId, spanId, startTimeUnixNano...),
+* exported through the OpenTelemetry SDK when ASSISTANT_OTEL=1 and
+  ``opentelemetry`` is installed, and
+* kept in a rolling window per stage for ``percentiles()``.
+
+``span`` is a context manager that also makes the span the parent of
+anything started inside it, including work handed to threads through
+``contextvars.copy_context()``. Generators that yield while a span is open
+use ``start``/``finish`` with an explicit parent instead, since the current
+span cannot be relied on across yields.
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+TRACE_FILE = os.environ.get(
+    "ASSISTANT_TRACE_FILE", os.path.join(tempfile.gettempdir(), "assistant-traces.jsonl")
+)
+TRACE_MAX_BYTES = int(float(os.environ.get("ASSISTANT_TRACE_MB", "10")) * 1024 * 1024)
+TRACE_BACKUPS = int(os.environ.get("ASSISTANT_TRACE_BACKUPS", "3"))
+WINDOW = int(os.environ.get("ASSISTANT_TRACE_WINDOW", "500"))
+OTEL_ENABLED = os.environ.get("ASSISTANT_OTEL", "0") == "1"
+
+_current = contextvars.ContextVar("assistant_span", default=None)
+
+_lock = threading.Lock()
+_windows = {}  # stage -> deque of durations in seconds
+_traces = OrderedDict()  # trace id -> finished span records, newest last
+_last_trace = {"id": None}
+_MAX_TRACES = 50
+
+_export = {"logger": None, "tracer": None, "ready": False}
+
+
+class Span:
+    """One timed stage of a turn"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start", "start_ns", "otel")
+
+    def __init__(self, name, parent, attributes):
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = {}
+        self.set(**attributes)
+        self.start = time.perf_counter()
+        self.start_ns = time.time_ns()
+        self.otel = None
+
+    def set(self, **attributes):
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+
+def _init_export():
+    if TRACE_FILE:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(TRACE_FILE)), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                TRACE_FILE, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger("assistant.traces")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+            _export["logger"] = logger
+        except OSError as e:
+            print(f"[tracing] Cannot write traces to {TRACE_FILE}: {str(e)}")
+    if OTEL_ENABLED:
+        try:
+            from opentelemetry import trace
+            _export["tracer"] = trace.get_tracer("assistant")
+        except ImportError:
+            print("[tracing] ASSISTANT_OTEL=1 but opentelemetry is not installed")
+    _export["ready"] = True
+
+
+def _exporters():
+    if not _export["ready"]:
+        with _lock:
+            if not _export["ready"]:
+                _init_export()
+    return _export["logger"], _export["tracer"]
+
+
+def _otel_value(value):
+    return value if isinstance(value, (bool, int, float, str)) else str(value)
+
+
+def current():
+    """The span work started now would be a child of, or None"""
+    return _current.get()
+
+
+def start(name, parent=None, **attributes):
+    """Open a span without making it current; close it with ``finish``"""
+    parent = parent if parent is not None else _current.get()
+    span = Span(name, parent, attributes)
+    _, tracer = _exporters()
+    if tracer is not None:
+        from opentelemetry import trace
+        context = trace.set_span_in_context(parent.otel) if parent is not None and parent.otel else None
+        span.otel = tracer.start_span(name, context=context, start_time=span.start_ns)
+    return span
+
+
+def finish(span, **attributes):
+    span.set(**attributes)
+    duration = time.perf_counter() - span.start
+    record = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "parentSpanId": span.parent_id,
+        "name": span.name,
+        "startTimeUnixNano": span.start_ns,
+        "endTimeUnixNano": span.start_ns + int(duration * 1e9),
+        "durationMs": round(duration * 1000, 2),
+        "attributes": span.attributes,
+    }
+    with _lock:
+        _windows.setdefault(span.name, deque(maxlen=WINDOW)).append(duration)
+        _traces.setdefault(span.trace_id, []).append(record)
+        _traces.move_to_end(span.trace_id)
+        while len(_traces) > _MAX_TRACES:
+            _traces.popitem(last=False)
+        if span.parent_id is None:
+            _last_trace["id"] = span.trace_id
+
+    logger, _ = _exporters()
+    if logger is not None:
+        logger.info(json.dumps(record, default=str))
+    if span.otel is not None:
+        for key, value in span.attributes.items():
+            span.otel.set_attribute(key, _otel_value(value))
+        span.otel.end(end_time=record["endTimeUnixNano"])
+    return record
+
+
+@contextmanager
+def span(name, parent=None, **attributes):
+    """Time the enclosed block as a child of ``parent`` (default: the current span)"""
+    opened = start(name, parent, **attributes)
+    token = _current.set(opened)
+    try:
+        yield opened
+    except BaseException as e:
+        opened.set(error=type(e).__name__)
+        raise
+    finally:
+        _reset(token)
+        finish(opened)
+
+
+@contextmanager
+def use(span):
+    """Make ``span`` the parent of spans started inside the block"""
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _reset(token)
+
+
+def _reset(token):
+    try:
+        _current.reset(token)
+    except ValueError:
+        # The block was resumed in another context (e.g. a generator moved threads)
+        pass
+
+
+def _percentile(samples, q):
+    return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))]
+
+
+def percentiles():
+    """Rolling p50/p95/p99 in milliseconds per stage"""
+    with _lock:
+        windows = {name: sorted(samples) for name, samples in _windows.items()}
+    return {
+        name: {
+            "count": len(samples),
+            "p50_ms": round(1000 * _percentile(samples, 0.50), 1),
+            "p95_ms": round(1000 * _percentile(samples, 0.95), 1),
+            "p99_ms": round(1000 * _percentile(samples, 0.99), 1),
+        }
+        for name, samples in windows.items() if samples
+    }
+
+
+def last_trace():
+    """Span records of the most recently finished turn, in start order"""
+    with _lock:
+        records = list(_traces.get(_last_trace["id"], []))
+    return sorted(records, key=lambda r: r["startTimeUnixNano"])
+
+
+def summary_markdown():
+    """Percentile table and last-turn breakdown for the UI panel"""
+    stats = percentiles()
+    if not stats:
+        return "No turns traced yet."
+    lines = ["| Stage | Count | p50 (ms) | p95 (ms) | p99 (ms) |", "|---|---:|---:|---:|---:|"]
+    for name in sorted(stats, key=lambda n: (n != "turn", n)):
+        s = stats[name]
+        lines.append(f"| {name} | {s['count']} | {s['p50_ms']} | {s['p95_ms']} | {s['p99_ms']} |")
+    records = last_trace()
+    if records:
+        parts = []
+        for r in records:
+            if r["parentSpanId"] is None:
+                continue
+            tokens = r["attributes"].get("total_tokens")
+            parts.append(f"{r['name']} {r['durationMs']:.0f} ms" + (f" ({tokens} tok)" if tokens else ""))
+        total = next((r["durationMs"] for r in records if r["parentSpanId"] is None), None)
+        if total is not None:
+            lines.append("")
+            lines.append(f"**Last turn: {total:.0f} ms** — " + " · ".join(parts))
+    return "\n".join(lines)
+
+
+def reset():
+    with _lock:
+        _windows.clear()
+        _traces.clear()
+        _last_trace["id"] = None
@@ -0,0 +1,162 @@
+"""Shared pooled HTTP client used by every agent.
+
+One ``httpx.Client`` keeps keep-alive connections open per host so repeat
+tool calls skip the TCP/TLS handshake. Pool size and timeouts come from the
+environment (or ``configure``); HTTP/2 is enabled when the ``h2`` package is
+installed. Tests and benchmarks can inject their own client with
+``set_client`` or redirect hosts to local stand-ins with ``set_host_overrides``.
+
+Every GET goes through ``assistant.resilience`` under the name of its host,
+so each API has its own circuit breaker and hedging, and timeouts shrink to
+what is left of the current turn's latency budget.
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from assistant import resilience
+
+POOL_SIZE = int(os.environ.get("ASSISTANT_HTTP_POOL_SIZE", "20"))
+KEEPALIVE_SIZE = int(os.environ.get("ASSISTANT_HTTP_KEEPALIVE", "10"))
+CONNECT_TIMEOUT = float(os.environ.get("ASSISTANT_HTTP_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.environ.get("ASSISTANT_HTTP_READ_TIMEOUT", "5"))
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+_host_overrides = {}
+
+
+def http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _client_options(pool_size, keepalive_size, connect_timeout, read_timeout, http2, transport):
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=pool_size or POOL_SIZE,
+        max_keepalive_connections=keepalive_size or KEEPALIVE_SIZE,
+    )
+    read = read_timeout or READ_TIMEOUT
+    timeout = httpx.Timeout(read, connect=connect_timeout or CONNECT_TIMEOUT)
+    return dict(
+        limits=limits,
+        timeout=timeout,
+        http2=http2_available() if http2 is None else http2,
+        transport=transport,
+        follow_redirects=True,
+        headers={"User-Agent": "ai-voice-assistant/1.0"},
+    )
+
+
+def build_client(pool_size=None, keepalive_size=None, connect_timeout=None,
+                 read_timeout=None, http2=None, transport=None):
+    """Create a pooled client; arguments default to the module settings"""
+    import httpx
+
+    return httpx.Client(**_client_options(
+        pool_size, keepalive_size, connect_timeout, read_timeout, http2, transport
+    ))
+
+
+def build_async_client(pool_size=None, keepalive_size=None, connect_timeout=None,
+                       read_timeout=None, http2=None, transport=None):
+    """Async counterpart of build_client for the asyncio pipeline"""
+    import httpx
+
+    return httpx.AsyncClient(**_client_options(
+        pool_size, keepalive_size, connect_timeout, read_timeout, http2, transport
+    ))
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build_client()
+    return _client
+
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = build_async_client()
+    return _async_client
+
+
+def set_async_client(client):
+    """Replace the shared async client; the previous one is dropped, not closed"""
+    global _async_client
+    with _client_lock:
+        _async_client = client
+
+
+def set_client(client):
+    """Replace the shared client (e.g. one built with an httpx.MockTransport)"""
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    if previous is not None and previous is not client:
+        previous.close()
+
+
+def configure(**kwargs):
+    """Rebuild the shared client with new pool/timeout settings"""
+    set_client(build_client(**kwargs))
+
+
+def set_host_overrides(overrides):
+    """Route requests for a host to another base URL, e.g. {"wttr.in": "http://127.0.0.1:8001"}"""
+    _host_overrides.clear()
+    _host_overrides.update(overrides or {})
+
+
+def _rewrite(url):
+    if not _host_overrides:
+        return url
+    parts = urlsplit(url)
+    base = _host_overrides.get(parts.netloc)
+    if base is None:
+        return url
+    target = urlsplit(base)
+    path = target.path.rstrip("/") + parts.path
+    return urlunsplit((target.scheme, target.netloc, path, parts.query, parts.fragment))
+
+
+def _budgeted(kwargs):
+    """Request options with the timeout cut to the turn's remaining budget"""
+    if "timeout" in kwargs or resilience.remaining() is None:
+        return kwargs
+    import httpx
+
+    read = resilience.timeout(READ_TIMEOUT)
+    return dict(kwargs, timeout=httpx.Timeout(read, connect=min(CONNECT_TIMEOUT, read)))
+
+
+def _get(url, kwargs):
+    return get_client().get(_rewrite(url), **_budgeted(kwargs))
+
+
+async def _aget(url, kwargs):
+    return await get_async_client().get(_rewrite(url), **_budgeted(kwargs))
+
+
+def get(url, **kwargs):
+    return resilience.call(urlsplit(url).netloc, _get, url, kwargs)
+
+
+async def aget(url, **kwargs):
+    return await resilience.acall(urlsplit(url).netloc, _aget, url, kwargs)
+
+
+def close():
+    set_client(None)
@@ -1,17 +1,343 @@
+import contextvars
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
 import tempfile
-from gtts import gTTS
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from assistant import tracing
 
+# Sentence boundary: terminal punctuation followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
 
-def text_to_speech(text):
-    """Convert text to speech using Google TTS"""
+# Shared worker pool so sentence synthesis overlaps with token generation
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts")
+
+# Separate pool for the pieces of one long reply, so chunk jobs never wait
+# behind the whole-reply jobs queued on _executor
+_chunk_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts-chunk")
+
+# Replies longer than this are synthesized as parallel chunks and stitched
+CHUNK_CHARS = int(os.environ.get("ASSISTANT_TTS_CHUNK_CHARS", "200"))
+
+DEFAULT_BACKEND = os.environ.get("ASSISTANT_TTS_BACKEND", "gtts")
+
+# Content-addressed audio cache: identical (text, lang, backend) is synthesized once
+CACHE_DIR = os.environ.get(
+    "ASSISTANT_TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "assistant-tts")
+)
+CACHE_MAX_BYTES = int(float(os.environ.get("ASSISTANT_TTS_CACHE_MB", "200")) * 1024 * 1024)
+# CACHE_DIR may be shared by several worker processes, so hits and the size
+# limit are checked against the directory itself; file mtimes (bumped on
+# every hit) are the LRU order. Sizes are rescanned at least this often.
+CACHE_SCAN_SECONDS = 60
+# A full cache is trimmed below the limit, so the next writes do not each
+# trigger another scan
+CACHE_TRIM_RATIO = 0.9
+# Partial writes older than this were orphaned by a crash, not still in progress
+PARTIAL_MAX_AGE = 600
+
+_cache_lock = threading.Lock()
+_cache_state = {
+    "ready": False, "scanning": False, "bytes": 0, "files": 0, "stored_bytes": 0, "stored_files": 0,
+    "scanned_at": 0.0, "hits": 0, "misses": 0, "evictions": 0,
+}
+
+
+def _scan():
+    """(mtime, path, size) of every cached file, least recently used first"""
+    entries = []
+    now = time.time()
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+            if name.endswith(".part"):
+                if now - stat.st_mtime > PARTIAL_MAX_AGE:
+                    os.remove(path)
+            elif name.endswith((".mp3", ".wav")):
+                entries.append((stat.st_mtime, path, stat.st_size))
+        except OSError:
+            # Evicted or renamed by another worker meanwhile
+            continue
+    return sorted(entries)
+
+
+def _trim(keep):
+    """(bytes, files, evicted) after trimming a full cache to CACHE_TRIM_RATIO of the limit"""
+    entries = _scan()
+    total, files, evicted = sum(size for _, _, size in entries), len(entries), 0
+    target = CACHE_MAX_BYTES * CACHE_TRIM_RATIO if total > CACHE_MAX_BYTES else CACHE_MAX_BYTES
+    for _, path, size in entries:
+        if total <= target:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total, files, evicted = total - size, files - 1, evicted + 1
+    return total, files, evicted
+
+
+def _evict(keep=None):
+    """Rescan the cache directory and trim it, oldest files first.
+
+    Runs without _cache_lock so lookups are not held up; the caller has set
+    ``scanning`` so only one thread rescans at a time.
+    """
+    try:
+        trimmed = _trim(keep)
+    except OSError as e:
+        print(f"TTS cache scan failed: {str(e)}")
+        trimmed = None
+    with _cache_lock:
+        _cache_state.update(scanning=False, scanned_at=time.monotonic())
+        if trimmed is None:
+            return
+        total, files, evicted = trimmed
+        # Files stored while the scan ran may be missing from it
+        _cache_state.update(
+            bytes=total + _cache_state["stored_bytes"],
+            files=files + _cache_state["stored_files"],
+            stored_bytes=0,
+            stored_files=0,
+        )
+        _cache_state["evictions"] += evicted
+
+
+def _claim_scan():
+    """Under _cache_lock: True when this thread should run the next rescan"""
+    if _cache_state["scanning"]:
+        return False
+    _cache_state.update(scanning=True, stored_bytes=0, stored_files=0)
+    return True
+
+
+def cache_key(text, lang="en", backend="gtts"):
+    """Content address of one rendering: the same text in another voice is a different file"""
+    payload = json.dumps([text, lang, backend], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_lookup(path):
+    with _cache_lock:
+        scan = not _cache_state["ready"] and _claim_scan()
+        if scan:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _cache_state["ready"] = True
+        # Any worker may have written it
+        hit = os.path.exists(path)
+        _cache_state["hits" if hit else "misses"] += 1
+    if scan:
+        _evict()
+    if hit:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return hit
+
+
+def _cache_store(path):
+    size = os.path.getsize(path)
+    with _cache_lock:
+        _cache_state["bytes"] += size
+        _cache_state["files"] += 1
+        _cache_state["stored_bytes"] += size
+        _cache_state["stored_files"] += 1
+        # Other workers' writes only show up in a rescan
+        stale = time.monotonic() - _cache_state["scanned_at"] > CACHE_SCAN_SECONDS
+        scan = (stale or _cache_state["bytes"] > CACHE_MAX_BYTES) and _claim_scan()
+    if scan:
+        _evict(keep=path)
+
+
+def cache_stats():
+    with _cache_lock:
+        return {
+            "files": _cache_state["files"],
+            "bytes": _cache_state["bytes"],
+            "max_bytes": CACHE_MAX_BYTES,
+            "hits": _cache_state["hits"],
+            "misses": _cache_state["misses"],
+            "evictions": _cache_state["evictions"],
+        }
+
+
+class TTSBackend:
+    """A speech engine that renders text into an audio file"""
+
+    name = None
+    label = None
+    extension = "mp3"
+
+    def available(self):
+        return True
+
+    def synthesize(self, text, lang, path):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+    label = "Google TTS (online)"
+    extension = "mp3"
+
+    def synthesize(self, text, lang, path):
+        from gtts import gTTS
+
+        gTTS(text=text, lang=lang, slow=False).save(path)
+
+
+class EspeakBackend(TTSBackend):
+    """Local offline engine via the espeak-ng / espeak command line tool"""
+
+    name = "espeak"
+    label = "eSpeak (offline)"
+    extension = "wav"
+
+    def _executable(self):
+        return shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self):
+        return self._executable() is not None
+
+    def synthesize(self, text, lang, path):
+        # Text goes in on stdin so a reply starting with "-" is never read as an option
+        subprocess.run(
+            [self._executable(), "-v", lang, "-w", path, "--stdin"],
+            input=text.encode("utf-8"),
+            check=True,
+            capture_output=True,
+            timeout=60,
+        )
+
+
+_backends = {}
+
+
+def register_backend(backend):
+    _backends[backend.name] = backend
+
+
+def get_backend(name=None):
+    backend = _backends.get(name or DEFAULT_BACKEND)
+    if backend is None or not backend.available():
+        backend = _backends["gtts"]
+    return backend
+
+
+def available_backends():
+    """(label, name) pairs for the engines usable on this machine"""
+    return [(b.label, b.name) for b in _backends.values() if b.available()]
+
+
+register_backend(GTTSBackend())
+register_backend(EspeakBackend())
+
+
+def _split_chunks(text, limit=CHUNK_CHARS):
+    """Group sentences into chunks of roughly ``limit`` characters"""
+    chunks, current = [], ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if current and len(current) + len(sentence) + 1 > limit:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _synthesize_cached(text, lang, backend):
+    output_file = os.path.join(CACHE_DIR, f"{cache_key(text, lang, backend.name)}.{backend.extension}")
+    if _cache_lookup(output_file):
+        return output_file
+
+    partial_file = f"{output_file}.{threading.get_ident()}.part"
     try:
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-        output_file = temp_file.name
-        temp_file.close()
-        
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(output_file)
+        backend.synthesize(text, lang, partial_file)
+        os.replace(partial_file, output_file)
+    finally:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+    _cache_store(output_file)
+    return output_file
+
+
+def _can_stitch(fmt):
+    # pydub handles wav natively but needs ffmpeg to decode/encode mp3
+    return fmt == "wav" or shutil.which("ffmpeg") is not None
+
+
+def _stitch(paths, output_file, fmt):
+    from pydub import AudioSegment
+
+    combined = AudioSegment.empty()
+    for path in paths:
+        combined += AudioSegment.from_file(path)
+    partial_file = f"{output_file}.{threading.get_ident()}.part"
+    try:
+        combined.export(partial_file, format=fmt)
+        os.replace(partial_file, output_file)
+    finally:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+    _cache_store(output_file)
+    return output_file
+
+
+def text_to_speech(text, lang='en', backend=None):
+    """Convert text to speech, reusing cached audio when possible.
+
+    Long replies are split into sentence chunks that are synthesized in
+    parallel and stitched together with pydub.
+    """
+    with tracing.span("tts", chars=len(text), backend=backend or DEFAULT_BACKEND) as span:
+        output_file = _text_to_speech(text, lang, backend)
+        if output_file and os.path.exists(output_file):
+            span.set(audio_bytes=os.path.getsize(output_file))
         return output_file
+
+
+def _text_to_speech(text, lang, backend):
+    try:
+        engine = get_backend(backend)
+        chunks = _split_chunks(text)
+        if len(chunks) <= 1 or not _can_stitch(engine.extension):
+            return _synthesize_cached(text, lang, engine)
+
+        output_file = os.path.join(CACHE_DIR, f"{cache_key(text, lang, engine.name)}.{engine.extension}")
+        if _cache_lookup(output_file):
+            return output_file
+
+        futures = [_chunk_executor.submit(_synthesize_cached, chunk, lang, engine) for chunk in chunks]
+        paths = [future.result() for future in futures]
+        try:
+            return _stitch(paths, output_file, engine.extension)
+        except Exception as e:
+            print(f"TTS stitch failed, synthesizing in one piece: {str(e)}")
+            return _synthesize_cached(text, lang, engine)
     except Exception as e:
         print(f"TTS Error: {str(e)}")
         return None
+
+
+def split_sentences(buffer):
+    """Split buffered text into complete sentences and the unfinished remainder"""
+    parts = _SENTENCE_END.split(buffer)
+    sentences = [p.strip() for p in parts[:-1] if p.strip()]
+    return sentences, parts[-1]
+
+
+def text_to_speech_async(text, backend=None):
+    """Schedule speech synthesis on the background pool and return a future"""
+    # Carry the caller's trace so the tts span lands under its turn
+    return _executor.submit(contextvars.copy_context().run, text_to_speech, text, backend=backend)
@@ -4,11 +4,25 @@ import os
 # Set before importing gradio so the analytics thread is not started.
 os.environ.setdefault("GRADIO_ANALYTICS_ENABLED", "false")
 
-import gradio as gr
-from assistant.core import voice_chat, clear_conversation
+from assistant import prefetch, tracing
+from assistant import tts as tts_module
+from assistant.core import respond, respond_live, live_transcript, clear_conversation
+from assistant.async_core import respond_async, respond_live_async
 
+# Serve turns with the asyncio pipeline instead of one worker thread per turn
+ASYNC_PIPELINE = os.environ.get("ASSISTANT_ASYNC_PIPELINE", "0") == "1"
+# Voice turns run at once per process (Gradio's default is 1); later ones wait in the queue
+TURN_CONCURRENCY = int(os.environ.get("ASSISTANT_TURN_CONCURRENCY", "8"))
+# Turns allowed to wait; beyond this Gradio rejects new ones with "queue full" at once
+QUEUE_SIZE = int(os.environ.get("ASSISTANT_QUEUE_SIZE", "32"))
+# Stream the microphone while recording and transcribe finished phrases as the user talks
+STREAMING_INPUT = os.environ.get("ASSISTANT_STREAMING_INPUT", "0") == "1"
+
+
+def create_demo(async_pipeline=ASYNC_PIPELINE, streaming_input=STREAMING_INPUT):
+    """Build a new Gradio Blocks app for the assistant"""
+    import gradio as gr
 
-def build_ui():
     with gr.Blocks(theme=gr.themes.Soft(), css="""
         .gradio-container {
             max-width: 1200px !important;
@@ -26,7 +40,8 @@ def build_ui():
         **7 Agents:** Weather | Calculator | World Time | Wikipedia | News | Currency | Dictionary
         """)
         
-        state = gr.State([])
+        # Holds the session id; messages live in assistant.sessions.store
+        state = gr.State(None)
         
         with gr.Row():
             with gr.Column(scale=3):
@@ -45,13 +60,15 @@ def build_ui():
                 with gr.Row():
                     audio_input = gr.Audio(
                         sources=["microphone"],
-                        type="filepath",
+                        type="numpy" if streaming_input else "filepath",
+                        streaming=streaming_input,
                         label="🎤 Click to Record Your Voice"
                     )
                 
                 audio_output = gr.Audio(
                     label="🔊 AI Voice Response",
                     autoplay=True,
+                    streaming=True,
                     visible=True
                 )
                 
@@ -63,21 +80,81 @@ def build_ui():
                 enable_tts = gr.Checkbox(
                     label="Enable Voice Response",
                     value=True,
-                    info="AI will respond with voice (Google TTS)"
+                    info="AI will respond with voice"
+                )
+                tts_backend = gr.Dropdown(
+                    choices=tts_module.available_backends(),
+                    value=tts_module.get_backend().name,
+                    label="Voice Engine",
+                    info="Offline engines avoid a network round trip per reply"
+                )
+                llm_rewrite = gr.Checkbox(
+                    label="Conversational Tool Answers",
+                    value=False,
+                    info="Let the model reword weather, time and currency results (slower)"
                 )
+                stream_response = gr.Checkbox(
+                    label="Stream Response",
+                    value=True,
+                    info="Speak each sentence as soon as it is generated"
+                )
+
+                with gr.Accordion("📈 Performance", open=False):
+                    perf_panel = gr.Markdown(tracing.summary_markdown())
+                    perf_refresh = gr.Button("Refresh", size="sm")
+
+        # Each turn is a generator: every stage updates the status box, and the
+        # queue position is shown while a turn waits for a free slot
+        if streaming_input:
+            # Chunks feed the VAD and the live transcript; stop runs the turn on what was heard
+            audio_input.stream(
+                live_transcript,
+                inputs=[audio_input, state],
+                outputs=[chatbot, state, status_box],
+                concurrency_limit=None,
+                show_progress="hidden",
+            )
+            turn_handler = respond_live_async if async_pipeline else respond_live
+            turn_inputs = [state, enable_tts, stream_response, tts_backend, llm_rewrite]
+        else:
+            turn_handler = respond_async if async_pipeline else respond
+            turn_inputs = [audio_input, state, enable_tts, stream_response, tts_backend, llm_rewrite]
 
         audio_input.stop_recording(
-            voice_chat,
-            inputs=[audio_input, state, enable_tts],
-            outputs=[chatbot, state, audio_output, status_box]
-        )
+            turn_handler,
+            inputs=turn_inputs,
+            outputs=[chatbot, state, audio_output, status_box],
+            concurrency_limit=TURN_CONCURRENCY,
+            concurrency_id="turn",
+            trigger_mode="once",
+            show_progress="minimal",
+        ).then(tracing.summary_markdown, outputs=perf_panel, queue=False)
+
+        # Cheap handlers skip the queue so they stay responsive under load
+        perf_refresh.click(tracing.summary_markdown, outputs=perf_panel, queue=False)
 
         clear_btn.click(
             clear_conversation,
-            outputs=[chatbot, state, audio_output, status_box]
+            inputs=[state],
+            outputs=[chatbot, state, audio_output, status_box],
+            queue=False,
         )
 
+    demo.queue(max_size=QUEUE_SIZE, api_open=False)
+
+    # Warm the news feed and rate tables before the first question arrives
+    prefetch.start()
     return demo
 
 
-demo = build_ui()
+_demo = None
+
+
+def __getattr__(name):
+    # ``ui.demo`` is built on first access instead of at import time
+    global _demo
+    if name == "demo":
+        if _demo is None:
+            _demo = create_demo()
+        return _demo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,153 @@
+"""Wikipedia client that answers a query in one API request.
+
+A ``generator=search`` query returns the top search candidates together
+with their intro extract, canonical URL and disambiguation flag, so a
+query resolves to title, summary and URL in one round trip instead of the
+wikipedia library's search + summary + page calls. Disambiguation pages
+are skipped in favour of the next candidate from the same response.
+
+Two caches keep repeat questions off the network: query -> title
+("wikipedia_titles") and title -> summary ("wikipedia_summaries"). Every
+candidate in a search response is stored, and ``prefetch`` resolves
+several queries in parallel ahead of the tool call.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from assistant import cache, singleflight, transport
+
+LANG = os.environ.get("ASSISTANT_WIKIPEDIA_LANG", "en")
+SENTENCES = 4
+CANDIDATES = 3
+TITLE_TTL = 3 * 24 * 60 * 60
+SUMMARY_TTL = 3 * 24 * 60 * 60
+
+_titles = cache.get_cache("wikipedia_titles", TITLE_TTL)
+_summaries = cache.get_cache("wikipedia_summaries", SUMMARY_TTL)
+_flight = singleflight.group("wikipedia")
+_prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="wiki-prefetch")
+
+
+class NotFound(LookupError):
+    """No article matches the query"""
+
+
+def api_url():
+    return f"https://{LANG}.wikipedia.org/w/api.php"
+
+
+def _params(**extra):
+    params = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "redirects": "1",
+        "prop": "extracts|info|pageprops",
+        "exintro": "1",
+        "explaintext": "1",
+        "exsentences": str(SENTENCES),
+        "exlimit": "max",
+        "inprop": "url",
+        "ppprop": "disambiguation",
+    }
+    params.update(extra)
+    return params
+
+
+def search_params(query):
+    return _params(generator="search", gsrsearch=query, gsrlimit=str(CANDIDATES), gsrnamespace="0")
+
+
+def title_params(titles):
+    return _params(titles="|".join(titles))
+
+
+def _pages(response):
+    """Pages of an API response in search-rank order"""
+    response.raise_for_status()
+    pages = (response.json().get("query") or {}).get("pages") or []
+    if isinstance(pages, dict):  # formatversion=1 shape
+        pages = list(pages.values())
+    pages = [p for p in pages if not p.get("missing") and not p.get("invalid")]
+    return sorted(pages, key=lambda p: p.get("index", 0))
+
+
+def _entry(page):
+    return {
+        "title": page["title"],
+        "summary": (page.get("extract") or "").strip(),
+        "url": page.get("fullurl") or f"https://{LANG}.wikipedia.org/wiki/{page['title'].replace(' ', '_')}",
+    }
+
+
+def _store(pages):
+    """Cache every usable page and return the best one (first non-disambiguation page)"""
+    best = None
+    for page in pages:
+        disambiguation = "disambiguation" in (page.get("pageprops") or {})
+        if disambiguation or not page.get("extract"):
+            continue
+        entry = _entry(page)
+        _summaries.set(cache.make_key(entry["title"]), entry)
+        best = best or entry
+    if best is None and pages:
+        # Only disambiguation pages matched; its "may refer to" intro is still an answer
+        best = _entry(pages[0])
+    return best
+
+
+def _cached(query):
+    key = cache.make_key(query)
+    hit, title = _titles.get(key)
+    if not hit:
+        return key, None, None
+    hit, entry = _summaries.get(cache.make_key(title))
+    return key, title, entry if hit else None
+
+
+def _resolve(query):
+    key, title, entry = _cached(query)
+    if entry is not None:
+        return entry
+    params = title_params([title]) if title else search_params(query)
+    entry = _store(_pages(transport.get(api_url(), params=params)))
+    if entry is None:
+        raise NotFound(query)
+    _titles.set(key, entry["title"])
+    return entry
+
+
+async def _aresolve(query):
+    key, title, entry = _cached(query)
+    if entry is not None:
+        return entry
+    params = title_params([title]) if title else search_params(query)
+    entry = _store(_pages(await transport.aget(api_url(), params=params)))
+    if entry is None:
+        raise NotFound(query)
+    _titles.set(key, entry["title"])
+    return entry
+
+
+def lookup(query):
+    """{"title", "summary", "url"} for the best match; raises NotFound"""
+    return _flight.do(cache.make_key(query), _resolve, query)
+
+
+async def alookup(query):
+    """Asyncio counterpart of ``lookup``"""
+    return await _flight.ado(cache.make_key(query), _aresolve, query)
+
+
+def _quiet_lookup(query):
+    try:
+        return lookup(query)
+    except Exception as e:
+        print(f"[voice_chat] Wikipedia prefetch for {query!r} failed: {e}")
+        return None
+
+
+def prefetch(queries):
+    """Resolve ``queries`` in parallel in the background; returns their futures"""
+    return [_prefetch_pool.submit(_quiet_lookup, query) for query in queries if query]
@@ -0,0 +1,296 @@
+"""Local stand-ins for Groq and every agent API, served from one HTTP server.
+
+Path prefixes select the service, so the assistant is pointed at them with
+``GROQ_BASE_URL`` and ``transport.set_host_overrides``:
+
+    /groq/openai/v1/audio/transcriptions   Whisper (transcript looked up by file name)
+    /groq/openai/v1/chat/completions       chat, tool calls and SSE streaming
+    /wttr/<city>?format=j1                 wttr.in
+    /rates/v4/latest/<CUR>                 exchangerate-api
+    /dict/api/v2/entries/en/<word>         dictionaryapi.dev
+    /bbc/news/rss.xml                      BBC RSS feed
+    /wiki/w/api.php                        Wikipedia action API
+
+Every response waits for the configured latency first.
+The RSS feed and rate tables carry an ETag and answer conditional GETs
+with 304 Not Modified.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DEFAULT_LATENCY = {
+    "transcription": 0.15,
+    "completion": 0.25,
+    "token": 0.01,
+    "agent": 0.05,
+}
+
+_RATES = {"USD": 1.0, "EUR": 0.92, "GBP": 0.79, "INR": 83.1, "JPY": 151.2, "CNY": 7.2,
+          "CHF": 0.9, "CAD": 1.36, "AUD": 1.52, "AED": 3.67, "MXN": 17.1, "KRW": 1350.0, "RUB": 92.0}
+
+# (pattern, tool name, argument builder) used by the fake model to pick tools
+_TOOL_RULES = [
+    (re.compile(r"weather|chilly|rain|temperature|forecast"), "get_weather",
+     lambda text: {"city": _place(text) or "London"}),
+    (re.compile(r"\btime\b"), "get_world_time", lambda text: {"city": _place(text) or "London"}),
+    (re.compile(r"tell me about|who (?:is|was)"), "search_wikipedia",
+     lambda text: {"query": re.split(r"tell me about|who (?:is|was)", text, flags=re.I)[-1].strip(" ?.") or text}),
+    (re.compile(r"\bnews\b|headlines"), "get_news", lambda text: {"category": "general"}),
+]
+
+
+def _place(text):
+    m = re.search(r"\bin ([A-Za-z][A-Za-z ]+?)(?:[,?.!]| and |$)", text)
+    return m.group(1).strip() if m else None
+
+
+class FakeServices:
+    """Threaded HTTP server with the fake endpoints; use as a context manager"""
+
+    def __init__(self, transcripts=None, latency=None, host="127.0.0.1", port=0):
+        self.transcripts = dict(transcripts or {})
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.requests = {}
+        self._lock = threading.Lock()
+        handler = type("Handler", (_Handler,), {"services": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def host_overrides(self):
+        """Mapping for assistant.transport.set_host_overrides"""
+        return {
+            "wttr.in": f"{self.base_url}/wttr",
+            "api.exchangerate-api.com": f"{self.base_url}/rates",
+            "api.dictionaryapi.dev": f"{self.base_url}/dict",
+            "feeds.bbci.co.uk": f"{self.base_url}/bbc",
+            "en.wikipedia.org": f"{self.base_url}/wiki",
+        }
+
+    def count(self, service):
+        with self._lock:
+            self.requests[service] = self.requests.get(service, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    services = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_cacheable(self, body, content_type="application/json"):
+        body = (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.services.count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _sleep(self, kind):
+        delay = self.services.latency.get(kind, 0)
+        if delay:
+            time.sleep(delay)
+
+    def _split(self):
+        parts = urlsplit(self.path)
+        return parts.path, parse_qs(parts.query)
+
+    def do_GET(self):
+        path, query = self._split()
+        service = path.split("/")[1] if path.count("/") else ""
+        self.services.count(service)
+        self._sleep("agent")
+        if service == "wttr":
+            return self._send(200, _weather(unquote(path.split("/", 2)[2])))
+        if service == "rates":
+            base = path.rsplit("/", 1)[-1].upper()
+            if base not in _RATES:
+                return self._send(404, {"error": "unknown currency"})
+            return self._send_cacheable({"base": base, "rates": {k: v / _RATES[base] for k, v in _RATES.items()}})
+        if service == "dict":
+            return self._send(200, _definition(unquote(path.rsplit("/", 1)[-1])))
+        if service == "bbc":
+            return self._send_cacheable(_rss(), "application/rss+xml")
+        if service == "wiki":
+            return self._send(200, _wikipedia({k: v[0] for k, v in query.items()}))
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        path, _ = self._split()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if path.endswith("/audio/transcriptions"):
+            self.services.count("transcription")
+            self._sleep("transcription")
+            m = re.search(rb'filename="([^"]+)"', body)
+            name = m.group(1).decode("utf-8").rsplit("/", 1)[-1] if m else ""
+            # Intake may re-encode the upload (weather.wav -> weather.flac); match on the stem
+            stem = name.rsplit(".", 1)[0]
+            text = next((t for n, t in self.services.transcripts.items() if n.rsplit(".", 1)[0] == stem), "Hello there.")
+            return self._send(200, {"text": text})
+        if path.endswith("/chat/completions"):
+            self.services.count("completion")
+            request = json.loads(body or b"{}")
+            return self._chat(request)
+        self._send(404, {"error": "not found"})
+
+    def _chat(self, request):
+        self._sleep("completion")
+        content, tool_calls = _reply(request)
+        usage = _usage(request, content, tool_calls)
+        model = request.get("model", "fake")
+        if not request.get("stream"):
+            message = {"role": "assistant", "content": content}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            return self._send(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": message,
+                             "finish_reason": "tool_calls" if tool_calls else "stop"}],
+                "usage": usage,
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        def event(delta, finish_reason=None, x_groq=None):
+            chunk = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            if x_groq:
+                chunk["x_groq"] = x_groq
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        for i, call in enumerate(tool_calls or []):
+            event({"tool_calls": [dict(call, index=i)]})
+        for token in re.findall(r"\S+\s*", content or ""):
+            self._sleep("token")
+            event({"content": token})
+        event({}, "tool_calls" if tool_calls else "stop", {"id": chunk_id, "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def _reply(request):
+    messages = request.get("messages") or []
+    last = messages[-1] if messages else {}
+    if last.get("role") == "tool":
+        facts = [m.get("content", "") for m in messages if m.get("role") == "tool"]
+        summary = "; ".join(f[:80] for f in facts)
+        return f"Here is what I found. {summary}. Anything else?", None
+    text = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    offered = {t["function"]["name"] for t in request.get("tools") or []}
+    calls = []
+    for pattern, name, arguments in _TOOL_RULES:
+        if name in offered and pattern.search(text.lower()):
+            calls.append({"id": f"call_{uuid.uuid4().hex[:8]}", "type": "function",
+                          "function": {"name": name, "arguments": json.dumps(arguments(text))}})
+    if calls:
+        return None, calls
+    return "I'm doing well, thanks for asking. How can I help you today?", None
+
+
+def _usage(request, content, tool_calls):
+    prompt = len(json.dumps(request.get("messages", []))) + len(json.dumps(request.get("tools", [])))
+    completion = len(content or "") + len(json.dumps(tool_calls or []))
+    prompt_tokens, completion_tokens = prompt // 4, max(1, completion // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def _weather(city):
+    temp = 10 + sum(map(ord, city)) % 20
+    return {"current_condition": [{
+        "temp_C": str(temp), "temp_F": str(round(temp * 9 / 5 + 32)), "humidity": "60",
+        "windspeedKmph": "12", "FeelsLikeC": str(temp - 1), "weatherDesc": [{"value": "Partly cloudy"}],
+    }]}
+
+
+def _definition(word):
+    return [{"word": word, "phonetic": f"/{word}/", "meanings": [{
+        "partOfSpeech": "noun",
+        "definitions": [{"definition": f"A stand-in definition of {word}.", "example": f"The {word} was fake."}],
+    }]}]
+
+
+def _rss():
+    items = "".join(f"<item><title>Fake headline {i}</title></item>" for i in range(1, 8))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>BBC</title>{items}</channel></rss>'
+
+
+def _wikipedia(params):
+    if params.get("generator") == "search":
+        # Top hit, a disambiguation page and a related article, like a real search
+        topic = params.get("gsrsearch", "Topic").strip().title()
+        titles = [topic, f"{topic} (disambiguation)", f"History of {topic}"]
+    else:
+        titles = [t.strip() for t in params.get("titles", "Topic").split("|")]
+    pages = []
+    for index, title in enumerate(titles, 1):
+        page = {
+            "pageid": index, "ns": 0, "title": title, "index": index,
+            "fullurl": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}",
+            "extract": f"{title} is a topic served by the benchmark stand-in. It has a short summary. "
+                       f"The summary has several sentences. This is the last one.",
+        }
+        if title.endswith("(disambiguation)"):
+            page["pageprops"] = {"disambiguation": ""}
+            page["extract"] = f"{title[:-17]} may refer to several things."
+        pages.append(page)
+    if params.get("formatversion") == "2":
+        return {"batchcomplete": True, "query": {"pages": pages}}
+    return {"batchcomplete": "", "query": {"pages": {str(p["pageid"]): p for p in pages}}}
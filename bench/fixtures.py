@@ -0,0 +1,68 @@
+"""Audio fixtures for the benchmark.
+
+Each utterance becomes a WAV shaped like a browser recording: 48 kHz
+stereo, a tone whose length follows the length of the sentence, and
+silence before and after it. The fake Whisper endpoint maps the file name
+back to the transcript.
+"""
+
+import array
+import math
+import os
+import sys
+import wave
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+# Silence around the speech, as when the user is slow to start or to press stop
+LEAD_SILENCE_S = 0.5
+TAIL_SILENCE_S = 0.8
+
+# Mix of locally routed intents, model-picked tools and plain chat
+UTTERANCES = [
+    ("weather_london", "What's the weather in London?"),
+    ("time_tokyo", "What time is it in Tokyo?"),
+    ("currency", "Convert 100 dollars to euros"),
+    ("define", "Define serendipity."),
+    ("news", "What's the latest news?"),
+    ("math", "What's 15 times 20?"),
+    ("einstein", "Tell me about Albert Einstein"),
+    ("smalltalk", "Hello, how are you?"),
+    ("multi_tool", "Is it chilly in Paris, and what time is it there?"),
+]
+
+
+def _write_tone(path, seconds, frequency=220.0):
+    lead, tone, tail = (int(SAMPLE_RATE * s) for s in (LEAD_SILENCE_S, seconds, TAIL_SILENCE_S))
+    samples = array.array("h", [0] * lead)
+    samples.extend(int(8000 * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)) for i in range(tone))
+    samples.extend([0] * tail)
+    # Same signal on every channel
+    frames = array.array("h", (value for value in samples for _ in range(CHANNELS)))
+    if sys.byteorder == "big":
+        frames.byteswap()
+    with wave.open(path, "wb") as w:
+        w.setnchannels(CHANNELS)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(frames.tobytes())
+
+
+def build(directory, utterances=UTTERANCES, variant=0):
+    """Write the fixtures; returns ([(path, transcript)], {file name: transcript})
+
+    Each ``variant`` is a slightly detuned copy under its own file names, so
+    sessions can send the same sentences without sending identical audio.
+    """
+    os.makedirs(directory, exist_ok=True)
+    fixtures, transcripts = [], {}
+    suffix = f"-{variant}" if variant else ""
+    for index, (name, text) in enumerate(utterances):
+        path = os.path.join(directory, f"{name}{suffix}.wav")
+        if not os.path.exists(path):
+            # Roughly 15 characters per second of speech; a distinct pitch per
+            # utterance keeps equally long fixtures from sharing a fingerprint
+            _write_tone(path, max(0.5, len(text) / 15), frequency=220.0 + 20 * index + 0.5 * variant)
+        fixtures.append((path, text))
+        transcripts[os.path.basename(path)] = text
+    return fixtures, transcripts
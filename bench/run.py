@@ -0,0 +1,279 @@
+"""Offline end-to-end benchmark for the voice pipeline.
+
+Starts the fake Groq and agent services, points the assistant at them and
+drives ``assistant.core.voice_chat`` (or ``voice_chat_stream``) from N
+concurrent simulated sessions using the audio fixtures. Writes a JSON report
+with throughput, turn latency percentiles, per-stage percentiles from
+assistant.tracing, tool/router/cache counters, RSS growth and leaked file
+descriptors or temp files:
+
+    python -m bench.run --sessions 8 --turns 20 --output bench-results.json
+    python -m bench.run --baseline bench-results.json --max-regression 10
+
+With ``--baseline`` the headline numbers are compared against an earlier
+report and the exit status is 1 when any regresses by more than
+``--max-regression`` percent.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench import fixtures
+from bench.fake_services import FakeServices
+
+
+def _percentiles(samples):
+    if not samples:
+        return {}
+    samples = sorted(samples)
+
+    def pick(q):
+        return round(1000 * samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))], 1)
+
+    return {
+        "count": len(samples),
+        "mean_ms": round(1000 * sum(samples) / len(samples), 1),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(1000 * samples[-1], 1),
+    }
+
+
+def _rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def _temp_files():
+    try:
+        return set(os.listdir(tempfile.gettempdir()))
+    except OSError:
+        return set()
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _configure_environment(services, args):
+    # Everything below must be in place before the assistant package is imported
+    os.environ["GROQ_API_KEY"] = "benchmark"
+    os.environ["GROQ_BASE_URL"] = f"{services.base_url}/groq"
+    os.environ["NO_PROXY"] = os.environ["no_proxy"] = "127.0.0.1,localhost"
+    os.environ.setdefault("ASSISTANT_TRACE_FILE", args.trace_file or "")
+    os.environ.setdefault("ASSISTANT_TRACE_WINDOW", "1000000")
+    if not args.resubmit:
+        # Real recordings never repeat byte for byte; keep the warm-up's fixtures out of the transcript cache
+        os.environ["ASSISTANT_TRANSCRIPT_TTL"] = "0"
+
+
+def _run_session(core, index, turns, audio_fixtures, stream, enable_tts, cold):
+    from assistant import cache
+
+    session_id, latencies, errors = None, [], 0
+    for turn in range(turns):
+        audio, _ = audio_fixtures[(index + turn) % len(audio_fixtures)]
+        if cold:
+            cache.clear()
+        started = time.perf_counter()
+        if stream:
+            result = None
+            for result in core.voice_chat_stream(audio, session_id, enable_tts):
+                pass
+        else:
+            result = core.voice_chat(audio, session_id, enable_tts)
+        latencies.append(time.perf_counter() - started)
+        session_id = result[1]
+        if result[3].startswith("❌"):
+            errors += 1
+    return latencies, errors
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="assistant-bench-")
+    # One fixture set per session, unless repeated audio is what is being measured
+    session_fixtures, transcripts = [], {}
+    for variant in range(1 if args.resubmit else args.sessions):
+        built, names = fixtures.build(os.path.join(workdir, "audio"), variant=variant)
+        session_fixtures.append(built)
+        transcripts.update(names)
+    latency = {
+        "transcription": args.transcription_ms / 1000,
+        "completion": args.completion_ms / 1000,
+        "token": args.token_ms / 1000,
+        "agent": args.agent_ms / 1000,
+    }
+
+    with FakeServices(transcripts=transcripts, latency=latency) as services:
+        _configure_environment(services, args)
+        from assistant import (
+            cache, core, intake, prefetch, registry, resilience, router, sessions, singleflight, tracing, transport,
+        )
+
+        transport.set_host_overrides(services.host_overrides())
+
+        # Warm imports, pools and caches once so the measured window is steady state
+        for audio, _ in session_fixtures[0]:
+            core.voice_chat(audio, None, args.tts)
+        tracing.reset()
+        services.requests.clear()
+
+        rss_start, fds_start, temp_start = _rss_kb(), _open_fds(), _temp_files()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            outcomes = list(pool.map(
+                lambda i: _run_session(core, i, args.turns, session_fixtures[i % len(session_fixtures)],
+                                     args.stream, args.tts, args.cold),
+                range(args.sessions),
+            ))
+        wall = time.perf_counter() - started
+        rss_end, fds_end, temp_end = _rss_kb(), _open_fds(), _temp_files()
+
+        latencies = [value for session, _ in outcomes for value in session]
+        errors = sum(e for _, e in outcomes)
+        new_temp = sorted(temp_end - temp_start)
+        report = {
+            "meta": {
+                "commit": _commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "config": {
+                    "sessions": args.sessions,
+                    "turns_per_session": args.turns,
+                    "stream": args.stream,
+                    "tts": args.tts,
+                    "cold_cache": args.cold,
+                    "resubmit_audio": args.resubmit,
+                    "latency_ms": {k: round(v * 1000, 1) for k, v in latency.items()},
+                },
+            },
+            "turns": {
+                "total": len(latencies),
+                "errors": errors,
+                "wall_s": round(wall, 3),
+                "throughput_tps": round(len(latencies) / wall, 3) if wall else 0.0,
+                "latency": _percentiles(latencies),
+            },
+            "stages": tracing.percentiles(),
+            "tools": registry.stats(),
+            "router": router.stats(),
+            "cache": cache.stats(),
+            "coalescing": singleflight.stats(),
+            "breakers": resilience.stats(),
+            "prefetch": prefetch.stats(),
+            "audio_intake": intake.stats(),
+            "sessions": sessions.store.stats(),
+            "upstream_requests": dict(services.requests),
+            "resources": {
+                "rss_start_kb": rss_start,
+                "rss_end_kb": rss_end,
+                "rss_growth_kb": rss_end - rss_start,
+                "open_fds_start": fds_start,
+                "open_fds_end": fds_end,
+                "fd_growth": (fds_end - fds_start) if fds_start is not None else None,
+                "new_temp_files": len(new_temp),
+                "new_temp_files_sample": new_temp[:20],
+            },
+        }
+    return report
+
+
+# Headline metrics compared against a baseline; True means higher is better
+_HEADLINES = [
+    (("turns", "throughput_tps"), True),
+    (("turns", "latency", "p50_ms"), False),
+    (("turns", "latency", "p95_ms"), False),
+    (("turns", "latency", "p99_ms"), False),
+    (("resources", "rss_growth_kb"), False),
+    (("resources", "fd_growth"), False),
+]
+
+
+def _lookup(report, path):
+    for key in path:
+        if not isinstance(report, dict) or key not in report:
+            return None
+        report = report[key]
+    return report
+
+
+def compare(report, baseline, max_regression=None):
+    """Print headline deltas; returns the list of metrics that regressed beyond the limit"""
+    regressions = []
+    for path, higher_is_better in _HEADLINES:
+        new, old = _lookup(report, path), _lookup(baseline, path)
+        if new is None or old is None:
+            continue
+        change = ((new - old) / abs(old) * 100) if old else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        name = ".".join(path)
+        print(f"{name:32} {old:>12} -> {new:>12}  ({change:+.1f}%)")
+        if worse and max_regression is not None and abs(change) > max_regression and old:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated sessions")
+    parser.add_argument("--turns", type=int, default=10, help="turns per session")
+    parser.add_argument("--stream", action="store_true", help="drive voice_chat_stream instead of voice_chat")
+    parser.add_argument("--tts", action="store_true", help="synthesize replies (needs a TTS backend)")
+    parser.add_argument("--cold", action="store_true", help="clear agent caches before every turn")
+    parser.add_argument("--resubmit", action="store_true", help="let repeated fixtures hit the transcript cache")
+    parser.add_argument("--transcription-ms", type=float, default=150)
+    parser.add_argument("--completion-ms", type=float, default=250)
+    parser.add_argument("--token-ms", type=float, default=10)
+    parser.add_argument("--agent-ms", type=float, default=50)
+    parser.add_argument("--trace-file", default="", help="also write spans to this JSONL file")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, help="fail when a headline metric regresses by more percent")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    turns = report["turns"]
+    print(f"{turns['total']} turns, {turns['errors']} errors, {turns['throughput_tps']} turns/s, "
+          f"p50 {turns['latency'].get('p50_ms')} ms, p95 {turns['latency'].get('p95_ms')} ms -> {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print("Regressed: " + ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
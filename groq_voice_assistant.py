@@ -5,7 +5,7 @@ from assistant import ui
 
 if __name__ == "__main__":
     try:
-        ui.demo.launch(share=False)
+        ui.create_demo().launch(share=False)
     except Exception as e:
         print(f"Failed to launch the UI: {str(e)}")
 
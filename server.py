@@ -1,14 +1,17 @@
 """Flask launcher that starts the Gradio UI in a background thread.
 
 Run this file to start a Flask server (with auto-reload) and have the
-Gradio demo served alongside it. The root route redirects to the Gradio UI.
+Gradio demo served alongside it. The root route redirects to the Gradio UI
+and /metrics reports per-stage latency percentiles and agent counters.
+This is the development launcher; production uses asgi.py.
 """
 
 import os
 import threading
-from flask import Flask, redirect
+from flask import Flask, jsonify, redirect
 
 from assistant import ui
+from assistant import metrics as metrics_module
 
 app = Flask(__name__)
 
@@ -20,7 +23,7 @@ def start_gradio():
         return
     _gradio_started = True
     # prevent_thread_lock allows Gradio to run inside a background thread
-    ui.demo.launch(share=False, prevent_thread_lock=True)
+    ui.create_demo().launch(share=False, prevent_thread_lock=True)
 
 
 @app.route("/")
@@ -29,6 +32,11 @@ def index():
     return redirect("http://127.0.0.1:7860/")
 
 
+@app.route("/metrics")
+def metrics():
+    return jsonify(metrics_module.snapshot())
+
+
 if __name__ == "__main__":
     # Only start Gradio in the reloader child process to avoid double starts.
     # Werkzeug sets WERKZEUG_RUN_MAIN to 'true' in the reloader child.